@@ -1,4 +1,6 @@
 from employee_rotation.app import main
+from employee_rotation.api import simulate, SimulationResult
+from employee_rotation.simulation import RunControl, Progress
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
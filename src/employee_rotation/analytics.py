@@ -0,0 +1,287 @@
+"""
+Capacity planning metrics computed from a run's event log.
+
+Everything is derived in a few polars passes over the events instead of
+replaying the rotation: per tick changes are aggregated by department and
+turned into levels with a cumulative sum.
+"""
+
+from __future__ import annotations
+
+import polars as pl
+
+from employee_rotation.models import EventLog, EventKind, NO_DEPARTMENT, Status
+
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+# The event frame of a log, lazy when its archive is scanned
+Events = pl.DataFrame | pl.LazyFrame
+
+
+def _ticks(log: EventLog) -> pl.LazyFrame:
+    return pl.LazyFrame(
+        {"tick": range(len(log.tick_dates)), "date": log.tick_dates},
+        schema={"tick": pl.Int32, "date": pl.Datetime("us")},
+    )
+
+
+def _departments(log: EventLog) -> pl.LazyFrame:
+    return pl.LazyFrame(
+        {
+            "department": range(len(log.department_names)),
+            "department_name": log.department_names,
+            "max_capacity": log.capacities,
+        },
+        schema={
+            "department": pl.Int32,
+            "department_name": pl.String,
+            "max_capacity": pl.Int64,
+        },
+    )
+
+
+def _events(log: EventLog, events: Events | None) -> pl.LazyFrame:
+    return log.scan() if events is None else events.lazy()
+
+
+def _same_employee(n: int) -> pl.Expr:
+    """
+    Whether the row `n` rows away belongs to the same employee, cheaper
+    than a window on frames sorted by employee
+    """
+    return pl.col("employee").shift(n).eq_missing(pl.col("employee"))
+
+
+def _employee_states(log: EventLog, events: Events | None = None) -> pl.LazyFrame:
+    """
+    Status of every employee at the end of each tick it changed, with the
+    department it is counted under.
+
+    Like the departments of the engine, people waiting for reassignment or
+    finished are counted under the last department they left. Sorted by
+    employee then tick.
+    """
+    kind = pl.col("kind")
+    current = (
+        pl.when(kind == EventKind.ASSIGN)
+        .then(pl.col("department"))
+        .when(kind == EventKind.REMOVE)
+        .then(NO_DEPARTMENT)
+    )
+    previous = pl.when(_same_employee(1)).then(pl.col("current").shift(1))
+    return (
+        _events(log, events)
+        .with_row_index("seq")
+        .filter(kind != EventKind.EXCLUDE)
+        .sort("employee", "seq")
+        # Everybody starts with an assignment, the fill never crosses employees
+        .with_columns(current=current.forward_fill())
+        .with_columns(
+            last=pl.when(
+                kind.is_in([EventKind.ASSIGN, EventKind.REMOVE])
+                & (previous != NO_DEPARTMENT)
+            )
+            .then(previous)
+            .when(~_same_employee(1))
+            .then(NO_DEPARTMENT)
+            .forward_fill()
+        )
+        .filter(~_same_employee(-1) | (pl.col("tick") != pl.col("tick").shift(-1)))
+        .select(
+            "employee",
+            "tick",
+            "date",
+            status=kind.replace_strict(
+                {
+                    EventKind.ASSIGN: Status.ASSIGNED.name,
+                    EventKind.REMOVE: Status.WAITING_REASSIGNMENT.name,
+                    EventKind.FINISH: Status.FINISHED.name,
+                },
+                return_dtype=pl.String,
+            ),
+            department=pl.when(kind == EventKind.ASSIGN)
+            .then(pl.col("current"))
+            .otherwise(pl.col("last")),
+        )
+    )
+
+
+def department_utilization(log: EventLog, events: Events | None = None) -> pl.DataFrame:
+    """
+    Occupancy, waiting queue and finished count of every department at
+    the end of every tick. `events` is the frame of `log` when the caller
+    already has it, otherwise the log is scanned.
+    """
+    kind = pl.col("kind")
+    occupancy = (
+        _events(log, events)
+        .filter(kind.is_in([EventKind.ASSIGN, EventKind.REMOVE]))
+        .group_by("tick", "department")
+        .agg(
+            occupancy=pl.when(kind == EventKind.ASSIGN).then(1).otherwise(-1).sum(),
+        )
+    )
+
+    states = _employee_states(log, events).with_columns(
+        pl.when(_same_employee(1))
+        .then(pl.col("status", "department").shift(1))
+        .name.prefix("previous_")
+    )
+    entering = states.select("tick", "status", "department", delta=pl.lit(1))
+    leaving = states.filter(pl.col("previous_status").is_not_null()).select(
+        "tick",
+        status=pl.col("previous_status"),
+        department=pl.col("previous_department"),
+        delta=pl.lit(-1),
+    )
+    queues = (
+        pl.concat([entering, leaving])
+        .filter(pl.col("status") != Status.ASSIGNED.name)
+        .group_by("tick", "department")
+        .agg(
+            waiting=pl.col("delta")
+            .filter(pl.col("status") == Status.WAITING_REASSIGNMENT.name)
+            .sum(),
+            finished=pl.col("delta")
+            .filter(pl.col("status") == Status.FINISHED.name)
+            .sum(),
+        )
+    )
+
+    levels = ["occupancy", "waiting", "finished"]
+    return (
+        _ticks(log)
+        .join(_departments(log), how="cross")
+        .join(occupancy, on=["tick", "department"], how="left")
+        .join(queues, on=["tick", "department"], how="left")
+        .with_columns(pl.col(levels).fill_null(0))
+        .sort("department", "tick")
+        .with_columns(pl.col(levels).cum_sum().over("department"))
+        .select(
+            "tick",
+            "date",
+            month=pl.col("date").dt.truncate("1mo"),
+            department=pl.col("department_name"),
+            max_capacity=pl.col("max_capacity"),
+            occupancy=pl.col("occupancy"),
+            utilization=pl.when(pl.col("max_capacity") > 0).then(
+                pl.col("occupancy") / pl.col("max_capacity")
+            ),
+            waiting=pl.col("waiting"),
+            finished=pl.col("finished"),
+        )
+        .sort("tick", "department")
+        .collect()
+    )
+
+
+def utilization_matrix(utilization: pl.DataFrame) -> pl.DataFrame:
+    """
+    Month x department utilization, averaged when two ticks fall in one month
+    """
+    return utilization.pivot(
+        on="department",
+        index="month",
+        values="utilization",
+        aggregate_function="mean",
+        sort_columns=True,
+    ).sort("month")
+
+
+def department_summary(utilization: pl.DataFrame) -> pl.DataFrame:
+    # Tick 0 is the roster as loaded, before the plan starts
+    return (
+        utilization.filter(pl.col("tick") > 0)
+        .group_by("department")
+        .agg(
+            max_capacity=pl.col("max_capacity").last(),
+            mean_utilization=pl.col("utilization").mean(),
+            peak_utilization=pl.col("utilization").max(),
+            full_ticks=(pl.col("occupancy") >= pl.col("max_capacity")).sum(),
+            mean_waiting=pl.col("waiting").mean(),
+            peak_waiting=pl.col("waiting").max(),
+        )
+        .sort("department")
+    )
+
+
+def waiting_spells(log: EventLog, events: Events | None = None) -> pl.DataFrame:
+    """
+    Every stretch an employee spent waiting for reassignment.
+
+    A spell still open at the end of the plan has no end and is measured up
+    to the last tick.
+    """
+    states = _employee_states(log, events).with_columns(
+        end=pl.when(_same_employee(-1)).then(pl.col("date").shift(-1)),
+        next_status=pl.when(_same_employee(-1)).then(pl.col("status").shift(-1)),
+    )
+    return (
+        states.filter(
+            (pl.col("status") == Status.WAITING_REASSIGNMENT.name)
+            & (
+                pl.col("next_status").is_null()
+                | (pl.col("next_status") == Status.ASSIGNED.name)
+            )
+        )
+        .select(
+            "employee",
+            department=pl.col("department").replace_strict(
+                dict(enumerate(log.department_names)), return_dtype=pl.String
+            ),
+            start=pl.col("date"),
+            end=pl.col("end"),
+            months=(
+                pl.col("end").fill_null(pl.lit(log.tick_dates[-1])) - pl.col("date")
+            ).dt.total_days()
+            / 30,
+        )
+        .sort("employee", "start")
+        .collect()
+    )
+
+
+def finish_times(log: EventLog, events: Events | None = None) -> pl.DataFrame:
+    """
+    When every employee completed the programme, in months from the plan
+    origin. Employees not finished at the end of the plan have no finish
+    date, even if they were marked finished at some point.
+    """
+    finished = (
+        _employee_states(log, events)
+        .group_by("employee")
+        .agg(pl.col("status", "date").last())
+        .select(
+            "employee",
+            finish=pl.when(pl.col("status") == Status.FINISHED.name).then(
+                pl.col("date")
+            ),
+        )
+    )
+    return (
+        pl.LazyFrame(
+            {"employee": range(len(log.employee_names)), "name": log.employee_names},
+            schema={"employee": pl.Int32, "name": pl.String},
+        )
+        .join(finished, on="employee", how="left")
+        .with_columns(
+            months=(pl.col("finish") - pl.lit(log.tick_dates[0])).dt.total_days() / 30
+        )
+        .sort("employee")
+        .collect()
+    )
+
+
+def distribution(values: pl.Series) -> pl.DataFrame:
+    """
+    Count, mean and quantiles of `values`, nulls counted apart as missing
+    """
+    return pl.DataFrame(
+        {
+            "count": [values.len()],
+            "missing": [values.null_count()],
+            "mean": [values.mean()],
+            **{f"p{q * 100:.0f}": [values.quantile(q)] for q in QUANTILES},
+            "max": [values.max()],
+        }
+    )
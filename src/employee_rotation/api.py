@@ -0,0 +1,97 @@
+"""
+Run a plan from other code, entirely in memory.
+
+`simulate` takes polars frames instead of reading `data.csv` and returns
+frames instead of writing files, so it can be called from services and
+notebooks without touching the disk.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import datetime as dt
+
+import polars as pl
+
+from employee_rotation.analytics import department_summary, department_utilization
+from employee_rotation.config import Config
+from employee_rotation.data import split_roster
+from employee_rotation.models import EventKind, EventLog, Rules
+from employee_rotation.report import training_stints
+from employee_rotation.simulation import RunControl, SimulationRun, run_simulation
+
+
+@dataclass
+class SimulationResult:
+    """
+    plan: every training with its start and end, no end if still running.
+    events: the event log with employee and department names.
+    summary: per department utilization and waiting statistics.
+    utilization: per tick and department occupancy, waiting and finished.
+    """
+
+    plan: pl.DataFrame
+    events: pl.DataFrame
+    summary: pl.DataFrame
+    utilization: pl.DataFrame
+    run: SimulationRun
+
+
+def event_table(log: EventLog, events: pl.DataFrame | None = None) -> pl.DataFrame:
+    return (log.to_frame() if events is None else events).select(
+        "tick",
+        "date",
+        kind=pl.col("kind").replace_strict(
+            {kind.value: kind.name for kind in EventKind}, return_dtype=pl.String
+        ),
+        employee=pl.col("employee").replace_strict(
+            dict(enumerate(log.employee_names)), return_dtype=pl.String
+        ),
+        department=pl.col("department").replace_strict(
+            dict(enumerate(log.department_names)),
+            default=None,
+            return_dtype=pl.String,
+        ),
+    )
+
+
+def simulate(
+    roster: pl.DataFrame | tuple[pl.DataFrame, pl.DataFrame],
+    config: Config | None = None,
+    rules: Rules | None = None,
+    origin: dt.datetime | None = None,
+    control: RunControl | None = None,
+) -> SimulationResult:
+    """
+    Simulate a roster and return the results as DataFrames.
+
+    `roster` is either the (departments, employees) frames `load_data`
+    returns, or one frame with a row per employee: first_name, last_name,
+    gender, start_date, current_department and duration_months. Department
+    capacities are then the headcount of each department, like `load_data`.
+    A `control` bounds the run, the result then covers the rotations
+    simulated before it stopped, see `result.run.stopped`.
+    """
+    if isinstance(roster, pl.DataFrame):
+        departments_df, employees_df = split_roster(roster)
+    else:
+        departments_df, employees_df = roster
+    config = config or Config()
+    rules = rules or Rules().add_rules(config.rules)
+
+    run = run_simulation(
+        departments_df,
+        employees_df,
+        rules,
+        config,
+        origin=origin,
+        control=control,
+    )
+    events = run.events.to_frame()
+    utilization = department_utilization(run.events, events)
+    return SimulationResult(
+        plan=training_stints(run.events, events),
+        events=event_table(run.events, events),
+        summary=department_summary(utilization),
+        utilization=utilization,
+        run=run,
+    )
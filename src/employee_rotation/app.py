@@ -1,179 +1,147 @@
+import datetime as dt
+import signal
+
 from employee_rotation.config import Config
-from employee_rotation.models import (
-    TrainingDepartment,
-    Employee,
-    Rules,
-    TimeSimulator,
-    rotate_employees,
-    Status,
+from employee_rotation.models import Rules, InfeasiblePlanException
+from employee_rotation.data import (
+    attach_history,
+    load_data,
+    load_history,
+    write_data,
+)
+from employee_rotation.feasibility import check_feasibility, format_feasibility_output
+from employee_rotation.incremental import replan
+from employee_rotation.monte_carlo import run_monte_carlo, Uncertainty
+from employee_rotation.optimizer import optimize_rotation_order
+from employee_rotation.report_pipeline import write_reports
+from employee_rotation.simulation import (
+    Progress,
+    RunControl,
+    run_simulation,
+    load_run,
+    save_run,
 )
-from employee_rotation.data import load_data, write_data
-
-
-def main():
-    config = Config()
-    t_simulator = TimeSimulator()
-    rules = Rules().add_rules(config.rules)
-
-    departments_df, employees_df = load_data(config.INPUT_FOLDER / "data.csv")
-
-    departements: list[TrainingDepartment] = []
-    employees: list[Employee] = []
-    lines = []
-
-    # initilize objects
-    for row in departments_df.iter_rows():
-        dept = TrainingDepartment(*row)
-        dept.time_simulator = t_simulator
-        departements.append(dept)
-
-    for row in employees_df.iter_rows():
-        emp = Employee.new(row, departments=departements)
-        emp.time_simulator = t_simulator
-        employees.append(emp)
-
-    # Before ratation
-    produce_rotation_output(departements, employees, lines)
-
-    # start delayed by month
-    t_simulator.forward_in_future(config.delay_start_by_months)
 
-    # rotate employees
-    for _ in range(config.rotations):
-        t_simulator.forward_in_future(config.rotation_length_in_months)
-        employees = rotate_employees(employees, departements, rules)
 
-        produce_rotation_output(departements, employees, lines)
+def print_progress(progress: Progress):
+    print(
+        f"rotation {progress.tick}/{progress.rotations}: "
+        f"{progress.active_trainees} in training, "
+        f"{progress.ticks_per_second:.1f} rotations/s"
+    )
 
-    plan_per_emp = employees_training_plan(employees)
 
-    write_data(config.OUTPUT_FOLDER / "plan.txt", lines)
-    write_data(config.OUTPUT_FOLDER / "plan_per_emp.txt", plan_per_emp, clean=True)
+def cancel_on_interrupt(control: RunControl):
+    """
+    First Ctrl+C stops the run after the current rotation, a second one aborts
+    """
+    previous = signal.getsignal(signal.SIGINT)
 
+    def cancel(signum, frame):
+        control.cancel()
+        signal.signal(signal.SIGINT, previous)
 
-def produce_rotation_output(
-    departements: list[TrainingDepartment],
-    employees: list[Employee],
-    lines: list[str],
-):
-    departements_formating = format_depatements_output(departements)
-    lines.extend(departements_formating)
-    lines.extend(format_employees_output(employees))
+    signal.signal(signal.SIGINT, cancel)
+    return previous
 
-    if len(departements_formating):
-        lines.extend(format_departments_summary_output(departements))
 
-        lines.append("\n")
-        lines.append("-----" * 20)
+def main():
+    config = Config()
+    config.create_folders()
+    rules = Rules().add_rules(config.rules)
+    # Every plan is dated from today, only an unchanged roster keeps the
+    # plan it already has
+    today = dt.datetime.now()
 
+    departments_df, employees_df = load_data(config.INPUT_FOLDER / "data.csv")
+    if config.warm_start_plan:
+        history = load_history(config.INPUT_FOLDER / config.warm_start_plan)
+        employees_df = attach_history(employees_df, history, today)
 
-def format_employees_output(
-    employees: list[Employee],
-) -> list[str]:
-    """
-    Helper function for output formatting for employees
-    """
-    lines = []
-    for emp in employees:
-        if not emp._changed:
-            continue
-
-        match emp.status:
-            case Status.WAITING_REASSIGNMENT:
-                indicator = "<-"
-                action = "Waiting Reassignment"
-                try:
-                    dept = emp.previous_departments[-1][0].name
-                except IndexError:
-                    dept = emp.current_department.name  # type: ignore
-
-            case Status.ASSIGNED:
-                indicator = "->"
-                action = "Assigned"
-                dept = emp.current_department.name  # type: ignore
-
-            case Status.FINISHED:
-                indicator = "**"
-                action = "Training Completed"
-                dept = "Finished"
-
-            case _:
-                raise NotImplementedError("Status case not implemented")
-
-        message = (
-            f"{action.rjust(32)}: {emp.full_name.ljust(30, '.')} {indicator} {dept}"
+    feasibility = check_feasibility(
+        departments_df, employees_df, rules, config, origin=today
+    )
+    feasibility_lines = format_feasibility_output(feasibility)
+    write_data(config.OUTPUT_FOLDER / "feasibility.txt", feasibility_lines, clean=True)
+    # Not finishing everybody is only a warning, the plan is still useful
+    if config.reject_infeasible_plans and feasibility.hopeless:
+        raise InfeasiblePlanException("\n".join(feasibility_lines))
+
+    if config.optimize_rotation_order_seconds:
+        optimized = optimize_rotation_order(
+            departments_df,
+            employees_df,
+            config,
+            budget_seconds=config.optimize_rotation_order_seconds,
+            origin=today,
         )
+        departments_df, employees_df = optimized.departments_df, optimized.employees_df
 
-        lines.append(message)
-
-    return lines
-
-
-def format_depatements_output(departements: list[TrainingDepartment]) -> list[str]:
-    """
-    Helper function for output formatting for departements
-    """
-
-    lines = []
-    for dept in sorted(departements, key=lambda dept: dept.max_capacity):
-        if not dept._rotation_movement:
-            continue
-
-        # actual_capacity = len(dept.non_training_employees) + len(dept.employees)
-        wait_reassignment = len(dept.waiting_reassignment)
-
-        lines.append(
-            f"{dept.time_simulator.now().strftime('%Y-%m')} "
-            f"{dept.name.rjust(16)} "
-            f"({dept.current_capacity}/{dept.max_capacity}/{wait_reassignment}): "
-            f"{sorted([emp.full_name for emp in dept.employees])} "
-            f"({dept._rotation_movement.count('-')}-/"
-            f"{dept._rotation_movement.count('+')}+)"
+    if config.rolling_horizon_rotations and config.incremental_replanning:
+        raise ValueError(
+            "rolling_horizon_rotations cannot be used with incremental_replanning"
         )
-    return lines
-
-
-def format_departments_summary_output(
-    departements: list[TrainingDepartment],
-) -> list[str]:
-    lines = []
-    max_capacity = sum(dept.max_capacity for dept in departements)
-    training = sum(dept.current_capacity for dept in departements)
-    wait_reassignment = sum(len(dept.waiting_reassignment) for dept in departements)
-    finished = sum(len(dept.finished) for dept in departements)
-    summary = (
-        "\n"
-        f"{'Departments summary'.rjust(32)}:"
-        f" {training} Training /"
-        f" {wait_reassignment} Waiting Reassignment /"
-        f" {finished} Finished /"
-        f" {max_capacity} Max Capacity "
+    control = RunControl(
+        budget_seconds=config.time_budget_seconds or None,
+        on_progress=print_progress if config.progress_every_rotations else None,
+        progress_every_ticks=config.progress_every_rotations,
     )
-    lines.append(summary)
-    return lines
-
-
-def employees_training_plan(
-    employees: list[Employee],
-) -> list[str]:
-    plan = []
-    for i, emp in enumerate(employees):
-        plan.extend(
-            [
-                ",".join(
-                    (
-                        str(i + 1),
-                        emp.full_name,
-                        entry[0].name,
-                        entry[1].strftime("%Y-%m"),
-                        entry[2].strftime("%Y-%m"),
-                    )
-                )
-                for entry in emp.previous_departments
-            ]
+    previous_handler = cancel_on_interrupt(control)
+    try:
+        if config.rolling_horizon_rotations:
+            run = run_simulation(
+                departments_df,
+                employees_df,
+                rules,
+                config,
+                origin=today,
+                archive=config.OUTPUT_FOLDER / "events",
+                control=control,
+            )
+        elif config.incremental_replanning:
+            state_file = config.OUTPUT_FOLDER / "run_state.pkl"
+            run = replan(
+                load_run(state_file),
+                departments_df,
+                employees_df,
+                rules,
+                config,
+                control=control,
+                today=today,
+            )
+            save_run(state_file, run)
+        else:
+            run = run_simulation(
+                departments_df,
+                employees_df,
+                rules,
+                config,
+                origin=today,
+                control=control,
+            )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    # A stopped run still writes the plan simulated so far
+    if run.stopped:
+        print(f"stopped after rotation {run.events.tick} ({run.stopped})")
+    write_reports(run, config.OUTPUT_FOLDER, config.reports)
+
+    if config.monte_carlo_replicas and not run.stopped:
+        robustness = run_monte_carlo(
+            departments_df,
+            employees_df,
+            config,
+            Uncertainty(**config.monte_carlo_uncertainty),
+            replicas=config.monte_carlo_replicas,
+            origin=run.origin,
+        )
+        robustness.employees.write_csv(
+            config.OUTPUT_FOLDER / "robustness_employees.csv"
+        )
+        robustness.departments.write_csv(
+            config.OUTPUT_FOLDER / "robustness_departments.csv"
         )
-
-    return plan
 
 
 if __name__ == "__main__":
@@ -10,12 +10,37 @@ class Config:
     rotations = years_of_plan * 12
     delay_start_by_months = 2
     rotation_length_in_months = 1.01
+    incremental_replanning = False
+    checkpoint_every_rotations = 12
+    rolling_horizon_rotations = 0
+    time_budget_seconds = 0
+    progress_every_rotations = 0
+    optimize_rotation_order_seconds = 0
+    reject_infeasible_plans = True
+    warm_start_plan = None
+    reports = [
+        "plan",
+        "plan_per_emp",
+        "utilization",
+        "department_rosters",
+        "employee_timelines",
+        "summary",
+        "roster_summary",
+        "events",
+    ]
+    monte_carlo_replicas = 0
+    monte_carlo_uncertainty = {
+        "duration_spread": 0.15,
+        "absence_probability": 0.1,
+        "absence_months": 1.0,
+        "attrition_per_year": 0.05,
+    }
     rules = [
         "train_once_in_each_dept",
         "exclude_female_from_Immobilisations",
         ("cannot_move_more_than_limit", {"limit": 1})
     ]
 
-    def __post_init__(self):
+    def create_folders(self):
         for folder in [self.INPUT_FOLDER, self.OUTPUT_FOLDER]:
             folder.mkdir(exist_ok=True, parents=True)
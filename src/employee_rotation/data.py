@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import Iterable, Iterator
+import datetime as dt
 
 import polars as pl
 
@@ -15,11 +17,25 @@ def load_data(input_file: Path):
         pl.col("Date Recrutement").str.to_datetime(date_format_en).alias("start_date"),
         pl.col("Section").alias("current_department"),
         pl.col("Durée Par section").alias("duration_months"),
-        pl.col("Durée Par section").count().over("Section").alias("max_capacity"),
+    )
+    return split_roster(df)
+
+
+def split_roster(roster: pl.LazyFrame | pl.DataFrame):
+    """
+    Departments and employees frames out of one roster with a row per
+    employee and the duration of their department. Departments come in the
+    order they first appear, the rotation hands seats out in that order.
+    """
+    df = roster.lazy().with_columns(
+        pl.col("duration_months")
+        .count()
+        .over("current_department")
+        .alias("max_capacity"),
     )
 
     department = (
-        df.group_by(pl.col("current_department"))
+        df.group_by(pl.col("current_department"), maintain_order=True)
         .agg(pl.col("duration_months").max(), pl.col("max_capacity").max())
         .collect()
     )
@@ -30,34 +46,145 @@ def load_data(input_file: Path):
         pl.col("gender"),
         pl.col("start_date"),
         pl.col("current_department"),
+        *(["history"] if "history" in df.collect_schema() else []),
     ).collect()
 
     return department, employees
 
 
-def write_data(file: Path, data: list[str], clean=False):
+HISTORY_SCHEMA = {
+    "employee": pl.Int64,
+    "name": pl.String,
+    "department": pl.String,
+    "start": pl.Datetime("us"),
+    "end": pl.Datetime("us"),
+}
+
+
+def load_history(input_file: Path) -> pl.DataFrame:
+    """
+    Trainings of an earlier plan, from its `plan_per_emp.txt` or from a
+    parquet file with name, department, start and end columns and
+    optionally the employee number of the plan. A stopped
+    plan or one where nobody finished a training yet leaves it empty.
+    """
+    if input_file.stat().st_size == 0:
+        return pl.DataFrame(schema=HISTORY_SCHEMA)
+    if input_file.suffix == ".parquet":
+        columns = pl.scan_parquet(input_file).collect_schema()
+        return pl.read_parquet(
+            input_file, columns=[col for col in HISTORY_SCHEMA if col in columns]
+        )
+
+    return pl.read_csv(
+        input_file,
+        has_header=False,
+        new_columns=["employee", "name", "department", "start", "end"],
+        schema_overrides={"start": pl.String, "end": pl.String},
+    ).select(
+        "employee",
+        "name",
+        "department",
+        *[
+            (pl.col(col) + "-01").str.to_datetime("%Y-%m-%d", time_unit="us")
+            for col in ["start", "end"]
+        ],
+    )
+
+
+def attach_history(
+    employees: pl.DataFrame,
+    history: pl.DataFrame,
+    today: dt.datetime | None = None,
+) -> pl.DataFrame:
+    """
+    Add a `history` column with the trainings each employee finished by
+    `today`, matched on the name the plan prints. Employees sharing a name
+    are told apart by their employee number, in roster order. A training in
+    the current department is left out, the employee is still on it.
+    """
+    today = today or dt.datetime.now()
+    employees = employees.drop("history", strict=False).with_row_index("position")
+    names = [
+        f"{last} {first}".title()
+        for first, last in employees.select("first_name", "last_name").iter_rows()
+    ]
+    roster = employees.select(
+        "position",
+        "current_department",
+        name=pl.Series(names),
+        occurrence=(pl.int_range(pl.len()).over(pl.Series(names)) + 1).cast(
+            pl.UInt32
+        ),
+    )
+    history = history.with_columns(
+        occurrence=(
+            pl.col("employee").rank("dense").over("name")
+            if "employee" in history.columns
+            else pl.lit(1, dtype=pl.UInt32)
+        )
+    )
+
+    homonyms = (
+        roster.group_by("name")
+        .agg(pl.col("occurrence").max())
+        .join(
+            history.group_by("name").agg(pl.col("occurrence").max()),
+            on="name",
+            suffix="_history",
+        )
+        .filter(
+            (pl.col("occurrence") != pl.col("occurrence_history"))
+            & (pl.max_horizontal("occurrence", "occurrence_history") > 1)
+        )
+    )
+    if homonyms.height:
+        raise ValueError(
+            "Cannot match the history of employees sharing a name: "
+            f"{', '.join(sorted(homonyms['name']))}"
+        )
+
+    past = (
+        history.lazy()
+        .filter(pl.col("end") <= today)
+        .join(roster.lazy(), on=["name", "occurrence"])
+        .filter(pl.col("department") != pl.col("current_department"))
+        .sort("position", "start")
+        .group_by("position", maintain_order=True)
+        .agg(history=pl.struct("department", "start", "end"))
+        .collect()
+    )
+    return (
+        employees.join(past, on="position", how="left")
+        .sort("position")
+        .drop("position")
+    )
+
+
+def write_data(file: Path, data: Iterable[str], clean=False):
     if not clean:
         data = clean_up_output(data)
+    # Streamed through the file buffer, the lines are never joined in memory
     with open(file, "w") as f:
-        for line in data:
-            f.write(line)
-            f.write("\n")
+        f.writelines(f"{line}\n" for line in data)
 
 
-def clean_up_output(lines):
+def clean_up_output(lines: Iterable[str]) -> Iterator[str]:
     """
     Remove the extra white line and add one when necessary
     """
-    prev_line = lines[0]
-    new_lines = [prev_line]
-    for line in lines[1:]:
+    lines = iter(lines)
+    prev_line = next(lines, None)
+    if prev_line is None:
+        return
+    yield prev_line
+    for line in lines:
         if line == "\n" and prev_line == "\n":
             continue
         if not prev_line.startswith("  ") and line.startswith("  "):
-            new_lines.append("\n")
+            yield "\n"
         prev_line = line
-        new_lines.append(line)
-    return new_lines
+        yield line
 
 
 if __name__ == "__main__":
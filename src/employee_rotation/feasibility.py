@@ -0,0 +1,281 @@
+"""
+Cheap lower bounds on how long a plan needs, computed before simulating it.
+
+Every employee has to train in each department they are not excluded from,
+so a department needs at least its required seat-months divided by its
+capacity, and with cannot_move_more_than_limit it can release at most
+`limit` trainees per rotation. Nobody can finish before the sum of their
+own remaining trainings either; trainings in a warm start's history are
+already done and not counted. Any of those bounds past the horizon means
+the simulation cannot complete everybody, which is only a warning. A plan
+is hopeless, and worth refusing, when a department somebody still needs
+can never release anyone, because a limit of 0 keeps everybody in place,
+or when nobody at all can finish, because every employee needs a
+department without seats or trainings longer than the horizon. Excluded
+departments count as done, so a department every employee is excluded
+from is no obstacle.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import datetime as dt
+
+import polars as pl
+
+from employee_rotation.config import Config
+from employee_rotation.models import Employee, Rules, TrainingDepartment
+
+
+@dataclass
+class FeasibilityReport:
+    departments: pl.DataFrame
+    plan_start: dt.datetime
+    horizon_months: float
+    earliest_finish_months: float
+    first_finish_months: float
+    stuck_employees: int
+
+    @property
+    def feasible(self) -> bool:
+        return self.earliest_finish_months <= self.horizon_months
+
+    @property
+    def hopeless_reasons(self) -> list[str]:
+        stalled = self.departments.filter(
+            (pl.col("max_capacity") > 0)
+            & (pl.col("releases") == 0)
+            & (pl.col("required_employees") > 0)
+        )
+        if stalled.height:
+            return [f"nobody can leave {', '.join(stalled['department'])}"]
+        if self.first_finish_months <= self.horizon_months:
+            return []
+        seatless = self.departments.filter(
+            (pl.col("max_capacity") == 0) & (pl.col("required_employees") > 0)
+        )
+        if seatless.height:
+            return [f"no seats in {', '.join(seatless['department'])}"]
+        return ["nobody can finish within the horizon"]
+
+    @property
+    def hopeless(self) -> bool:
+        return bool(self.hopeless_reasons)
+
+    @property
+    def earliest_finish(self) -> dt.datetime | None:
+        try:
+            return self.plan_start + dt.timedelta(days=30 * self.earliest_finish_months)
+        except OverflowError:
+            return None
+
+    @property
+    def bottlenecks(self) -> list[str]:
+        return self.departments.filter(pl.col("bottleneck"))["department"].to_list()
+
+
+def exclusion_pairs(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    rules: Rules,
+) -> pl.DataFrame:
+    """
+    (gender, department) pairs ruled out by the exclusion rules.
+
+    Exclusion rules only look at the employee's gender and the department,
+    so they are evaluated once per distinct gender instead of per employee.
+    """
+    departements = [TrainingDepartment(*row) for row in departments_df.iter_rows()]
+    return pl.DataFrame(
+        [
+            (gender, dept.name)
+            for gender in employees_df["gender"].unique()
+            for dept in departements
+            if rules.check(
+                Employee("", "", sexe=gender),
+                dept,
+                category="Exclusion",
+                position="Post",
+            )
+        ],
+        schema={"gender": pl.String, "department": pl.String},
+        orient="row",
+    )
+
+
+def trained_pairs(employees_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    (employee, department) pairs already trained according to the `history`
+    column a warm start attaches, those trainings are not required again.
+    """
+    if "history" not in employees_df.columns:
+        return pl.DataFrame(schema={"employee": pl.UInt32, "department": pl.String})
+    return (
+        employees_df.with_row_index("employee")
+        .select("employee", "history")
+        .explode("history")
+        .select("employee", department=pl.col("history").struct.field("department"))
+        .drop_nulls()
+        .unique()
+    )
+
+
+def check_feasibility(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    rules: Rules,
+    config: Config,
+    origin: dt.datetime | None = None,
+) -> FeasibilityReport:
+    plan_start = (origin or dt.datetime.now()) + dt.timedelta(
+        days=30 * config.delay_start_by_months
+    )
+    horizon = config.rotations * config.rotation_length_in_months
+    limits = [
+        kwargs["limit"] for kwargs in rules.parameters("cannot_move_more_than_limit")
+    ]
+
+    departments = departments_df.lazy().rename({"current_department": "department"})
+    excluded = exclusion_pairs(departments_df, employees_df, rules)
+
+    candidates = (
+        employees_df.lazy()
+        .with_row_index("employee")
+        .join(departments, how="cross")
+        .join(excluded.lazy(), on=["gender", "department"], how="anti")
+    )
+    trained = trained_pairs(employees_df).lazy()
+    required = candidates.join(
+        trained, on=["employee", "department"], how="anti"
+    ).with_columns(
+        months=pl.when(pl.col("department") == pl.col("current_department"))
+        .then(
+            (
+                pl.col("duration_months")
+                - (pl.lit(plan_start) - pl.col("start_date")).dt.total_days() / 30
+            ).clip(lower_bound=0)
+        )
+        .otherwise(pl.col("duration_months"))
+    )
+
+    seats = pl.col("max_capacity").cast(pl.Float64)
+    releases = pl.min_horizontal(seats, min(limits)) if limits else seats
+    per_department = (
+        departments.join(
+            required.group_by("department").agg(
+                required_employees=pl.len(),
+                demand_months=pl.col("months").sum(),
+            ),
+            on="department",
+            how="left",
+        )
+        .join(
+            candidates.join(trained, on=["employee", "department"], how="semi")
+            .group_by("department")
+            .agg(trained_employees=pl.len()),
+            on="department",
+            how="left",
+        )
+        .with_columns(
+            pl.col("required_employees").fill_null(0),
+            pl.col("trained_employees").fill_null(0),
+            pl.col("demand_months").fill_null(0.0),
+            releases=releases,
+        )
+        .with_columns(
+            excluded_employees=employees_df.height
+            - pl.col("required_employees")
+            - pl.col("trained_employees"),
+            capacity_finish_months=pl.when(pl.col("required_employees") == 0)
+            .then(0.0)
+            .when(seats == 0)
+            .then(float("inf"))
+            .otherwise(pl.col("demand_months") / seats),
+            throughput_finish_months=pl.when(pl.col("required_employees") == 0)
+            .then(0.0)
+            .when(pl.col("releases") == 0)
+            .then(float("inf"))
+            .otherwise(
+                (pl.col("required_employees") / pl.col("releases")).ceil()
+                * config.rotation_length_in_months
+            ),
+        )
+        .with_columns(
+            finish_months=pl.max_horizontal(
+                "capacity_finish_months", "throughput_finish_months"
+            )
+        )
+        .with_columns(bottleneck=pl.col("finish_months") > horizon)
+        .sort("finish_months", descending=True)
+    )
+
+    per_employee = required.group_by("employee").agg(
+        pl.col("months").sum(), seatless=(pl.col("max_capacity") == 0).any()
+    )
+    first_finish = (
+        employees_df.lazy()
+        .with_row_index("employee")
+        .join(per_employee, on="employee", how="left")
+        .select(
+            pl.when(pl.col("seatless"))
+            .then(float("inf"))
+            .otherwise(pl.col("months").fill_null(0.0))
+            .min()
+        )
+    )
+    per_department, longest_employee, first_employee = pl.collect_all(
+        [per_department, per_employee.select(pl.col("months").max()), first_finish]
+    )
+
+    stuck_employees = employees_df.join(
+        excluded,
+        left_on=["gender", "current_department"],
+        right_on=["gender", "department"],
+        how="semi",
+    ).height
+
+    return FeasibilityReport(
+        departments=per_department,
+        plan_start=plan_start,
+        horizon_months=horizon,
+        earliest_finish_months=max(
+            per_department["finish_months"].max() or 0.0,
+            longest_employee.item() or 0.0,
+        ),
+        first_finish_months=first_employee.item() or 0.0,
+        stuck_employees=stuck_employees,
+    )
+
+
+def format_feasibility_output(report: FeasibilityReport) -> list[str]:
+    lines = []
+    for row in report.departments.iter_rows(named=True):
+        lines.append(
+            f"{row['department'].rjust(16)} "
+            f"({row['required_employees']} required/{row['excluded_employees']} excluded/"
+            f"{row['max_capacity']} seats): "
+            f"needs {row['finish_months']:.1f} months"
+            f"{' ** bottleneck' if row['bottleneck'] else ''}"
+        )
+
+    finish = report.earliest_finish
+    lines.append("")
+    lines.append(
+        f"{'Earliest possible finish'.rjust(32)}: "
+        f"{finish.strftime('%Y-%m') if finish else 'never'} "
+        f"({report.earliest_finish_months:.1f} of {report.horizon_months:.1f} months)"
+    )
+    if report.stuck_employees:
+        lines.append(
+            f"{'Excluded from own department'.rjust(32)}: "
+            f"{report.stuck_employees} employee(s)"
+        )
+    if not report.feasible:
+        lines.append(
+            f"{'Infeasible plan'.rjust(32)}: "
+            f"{', '.join(report.bottlenecks) or 'trainings too long for the horizon'}"
+        )
+    if report.hopeless:
+        lines.append(
+            f"{'Hopeless plan'.rjust(32)}: {', '.join(report.hopeless_reasons)}"
+        )
+    return lines
@@ -1,3 +1,4 @@
 from employee_rotation.models.employee import *  # noqa: F403
 from employee_rotation.models.rules import *  # noqa: F403
 from employee_rotation.models.exceptions import *  # noqa: F403
+from employee_rotation.models.events import *  # noqa: F403
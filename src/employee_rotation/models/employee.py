@@ -10,6 +10,7 @@ from employee_rotation.models.exceptions import (
     EmployeeNotAssignedtoDepartmentException,
 )
 from employee_rotation.models.rules import Rules
+from employee_rotation.models.events import EventLog, EventKind
 
 
 class Status(Enum):
@@ -20,15 +21,28 @@ class Status(Enum):
 
 @dataclass
 class TimeSimulator:
-    forwarded_months = 0
+    """
+    Simulated clock shared by the objects of one run.
 
-    @classmethod
-    def forward_in_future(cls, months: float) -> None:
-        cls.forwarded_months += months
+    Every run owns its clock, so several runs can live in the same process.
+    """
 
-    @classmethod
-    def now(cls) -> dt.datetime:
-        return dt.datetime.now() + dt.timedelta(days=30 * cls.forwarded_months)
+    forwarded_months: float = 0
+    origin: Optional[dt.datetime] = None
+
+    def forward_in_future(self, months: float) -> None:
+        self.forwarded_months += months
+
+    def pin_origin(self, origin: Optional[dt.datetime] = None) -> dt.datetime:
+        """
+        Freeze the simulated clock start so a run can be resumed later
+        """
+        self.origin = origin or dt.datetime.now()
+        return self.origin
+
+    def now(self) -> dt.datetime:
+        start = self.origin or dt.datetime.now()
+        return start + dt.timedelta(days=30 * self.forwarded_months)
 
 
 @dataclass
@@ -42,9 +56,11 @@ class Employee:
         field(default_factory=list)
     )
     excluded_departments: list[TrainingDepartment] = field(default_factory=list)
-    time_simulator: TimeSimulator = dt.datetime  # type:ignore
+    time_simulator: TimeSimulator = dt.datetime  # type: ignore
     _status: Status = Status.ASSIGNED
     _changed: bool = False
+    event_log: Optional[EventLog] = field(default=None, compare=False)
+    extra_training_days: dict[str, float] = field(default_factory=dict, compare=False)
 
     def __repr__(self) -> str:
         return f"{self.first_name} works in {self.current_department} since {self.days_spent_training:.0f} month(s)"
@@ -52,7 +68,10 @@ class Employee:
     def has_completed_training(self) -> bool:
         if self.current_department is None:
             raise EmployeeNotAssignedtoDepartmentException
-        return self.current_department.duration - self.days_spent_training < 0
+        extra_days = self.extra_training_days.get(self.current_department.name, 0)
+        return (
+            self.current_department.duration + extra_days - self.days_spent_training < 0
+        )
 
     def has_department(self):
         return self.status == Status.ASSIGNED
@@ -98,6 +117,15 @@ class Employee:
             first_name=row[0], last_name=row[1], sexe=row[2], start_date=row[3]
         )
 
+        # Trainings finished before the plan starts, see `attach_history`
+        if len(row) > 5 and row[5]:
+            by_name = {dept.name: dept for dept in departments}
+            emp.previous_departments = [
+                (by_name[stint["department"]], stint["start"], stint["end"])
+                for stint in row[5]
+                if stint["department"] in by_name
+            ]
+
         str_dept = row[4]
         for dept in departments:
             if dept.name == str_dept:
@@ -118,6 +146,7 @@ class TrainingDepartment:
     non_training_employees: set[Employee] = field(default_factory=set)
     time_simulator: TimeSimulator = dt.datetime  # type: ignore
     _rotation_movement: str = ""
+    event_log: Optional[EventLog] = field(default=None, compare=False)
 
     def __repr__(self):
         return f"{self.name} ({self.current_capacity}/{self.max_capacity} with {self.duration_months} months)"
@@ -162,11 +191,17 @@ class TrainingDepartment:
             emp.start_date = start_date_overright
         self._rotation_movement += "+"
         emp.status = Status.ASSIGNED
+        if self.event_log is not None:
+            self.event_log.record(EventKind.ASSIGN, emp, self, emp.start_date)
         return self
 
     def exclude_employee(self, emp: Employee) -> Self:
         if self.name not in [dp.name for dp in emp.excluded_departments]:
             emp.excluded_departments.append(self)
+            if self.event_log is not None:
+                self.event_log.record(
+                    EventKind.EXCLUDE, emp, self, self.time_simulator.now()
+                )
         return self
 
     def remove_employee(self, emp: Employee) -> Self:
@@ -180,6 +215,10 @@ class TrainingDepartment:
                 break
         self._rotation_movement += "-"
         emp.status = Status.WAITING_REASSIGNMENT
+        if self.event_log is not None:
+            self.event_log.record(
+                EventKind.REMOVE, emp, self, self.time_simulator.now()
+            )
         return self
 
     @staticmethod
@@ -190,6 +229,10 @@ class TrainingDepartment:
             and emp.status is not Status.FINISHED
         ):
             emp.status = Status.FINISHED
+            if emp.event_log is not None:
+                emp.event_log.record(
+                    EventKind.FINISH, emp, None, emp.time_simulator.now()
+                )
 
     @staticmethod
     def readd_non_training(emp: Employee, departments: list[TrainingDepartment]):
@@ -0,0 +1,265 @@
+from __future__ import annotations
+from array import array
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+import datetime as dt
+
+import polars as pl
+
+if TYPE_CHECKING:
+    from employee_rotation.models.employee import Employee, TrainingDepartment
+
+
+EPOCH = dt.datetime(1970, 1, 1)
+NO_DEPARTMENT = -1
+
+
+class EventKind(IntEnum):
+    ASSIGN = 0
+    REMOVE = 1
+    EXCLUDE = 2
+    FINISH = 3
+
+
+def _to_micros(date: dt.datetime) -> int:
+    return (date - EPOCH) // dt.timedelta(microseconds=1)
+
+
+class EventLog:
+    """
+    Append-only columnar record of every state change of a rotation.
+
+    Each event is one row of `ticks`, `kinds`, `employees`, `departments`
+    and `dates`. Employees and departments are stored as ids, their names
+    live in `employee_names` and `department_names`. A tick is one block of
+    the plan: tick 0 is the initial placement, tick n is the n-th rotation.
+
+    With an `archive` folder, `flush` moves completed ticks out of memory
+    into parquet segments there, and every reader sees them transparently.
+    Segments left over from a previous log in that folder are removed.
+    """
+
+    def __init__(self, archive: Optional[Path] = None) -> None:
+        self.archive = archive
+        self.segments: list[Path] = []
+        self.archived_events = 0
+        self.flushed_tick = -1
+        if archive is not None:
+            archive.mkdir(exist_ok=True, parents=True)
+            for segment in archive.glob("events-*.parquet"):
+                segment.unlink()
+
+        self.ticks = array("i")
+        self.kinds = array("b")
+        self.employees = array("i")
+        self.departments = array("i")
+        self.dates = array("q")
+
+        self.tick_dates: list[dt.datetime] = []
+        self.employee_names: list[str] = []
+        self.department_names: list[str] = []
+        self.capacities: list[int] = []
+
+        self._employee_ids: dict[int, int] = {}
+        self._department_ids: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.archived_events + len(self.kinds)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_employee_ids"] = {}
+        state["_department_ids"] = {}
+        return state
+
+    @property
+    def tick(self) -> int:
+        return len(self.tick_dates) - 1
+
+    def advance(self, date: dt.datetime) -> None:
+        self.tick_dates.append(date)
+
+    def bind(
+        self,
+        departments: Iterable[TrainingDepartment],
+        employees: Iterable[Employee] = (),
+    ) -> None:
+        """
+        Map live objects to ids by position, registering unknown ones
+        """
+        self._department_ids = {}
+        for i, dept in enumerate(departments):
+            self._department_ids[id(dept)] = i
+            if i == len(self.department_names):
+                self.department_names.append(dept.name)
+                self.capacities.append(dept.max_capacity)
+
+        self._employee_ids = {}
+        for i, emp in enumerate(employees):
+            self._employee_ids[id(emp)] = i
+            if i == len(self.employee_names):
+                self.employee_names.append(emp.full_name)
+
+    def forget(self, emp: Employee) -> None:
+        """
+        Stop tracking an employee that will not change anymore, its id stays
+        """
+        self._employee_ids.pop(id(emp), None)
+
+    def employee_id(self, emp: Employee) -> int:
+        key = id(emp)
+        if key not in self._employee_ids:
+            self._employee_ids[key] = len(self.employee_names)
+            self.employee_names.append(emp.full_name)
+        return self._employee_ids[key]
+
+    def record(
+        self,
+        kind: EventKind,
+        emp: Employee,
+        dept: Optional[TrainingDepartment],
+        date: dt.datetime,
+    ) -> None:
+        self.ticks.append(self.tick)
+        self.kinds.append(kind)
+        self.employees.append(self.employee_id(emp))
+        self.departments.append(
+            NO_DEPARTMENT if dept is None else self._department_ids[id(dept)]
+        )
+        self.dates.append(_to_micros(date))
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self.ticks, self.kinds, self.employees, self.departments, self.dates)
+
+    def truncate(self, tick: int) -> None:
+        """
+        Drop everything recorded after `tick`
+        """
+        if tick < self.flushed_tick:
+            raise ValueError("Cannot truncate events already flushed to the archive")
+        end = len(self.ticks)
+        while end and self.ticks[end - 1] > tick:
+            end -= 1
+        for column in self._columns():
+            del column[end:]
+        del self.tick_dates[tick + 1 :]
+
+    def flush(self, tick: int) -> None:
+        """
+        Move the events up to `tick` to a new archive segment
+        """
+        if self.archive is None:
+            raise ValueError("Cannot flush an event log without archive")
+        end = 0
+        while end < len(self.ticks) and self.ticks[end] <= tick:
+            end += 1
+        if not end:
+            return
+
+        segment = self.archive / f"events-{len(self.segments):05d}.parquet"
+        self._frame(end).write_parquet(segment)
+        self.segments.append(segment)
+        self.archived_events += end
+        self.flushed_tick = tick
+        for column in self._columns():
+            del column[:end]
+
+    def frames(self) -> Iterator[pl.DataFrame]:
+        """
+        The events in order, one archive segment at a time
+        """
+        for segment in self.segments:
+            yield pl.read_parquet(segment)
+        yield self._frame(len(self.kinds))
+
+    def to_frame(self) -> pl.DataFrame:
+        if not self.segments:
+            return self._frame(len(self.kinds))
+        return pl.concat(self.frames())
+
+    def scan(self) -> pl.LazyFrame:
+        """
+        The events as a lazy frame, archive segments are only read by the
+        query collecting it instead of being loaded up front
+        """
+        frame = self._frame(len(self.kinds)).lazy()
+        if not self.segments:
+            return frame
+        return pl.concat([pl.scan_parquet(self.segments), frame])
+
+    def _frame(self, end: int) -> pl.DataFrame:
+        return pl.DataFrame(
+            {
+                "tick": pl.Series(self.ticks[:end], dtype=pl.Int32),
+                "kind": pl.Series(self.kinds[:end], dtype=pl.Int8),
+                "employee": pl.Series(self.employees[:end], dtype=pl.Int32),
+                "department": pl.Series(self.departments[:end], dtype=pl.Int32),
+                "date": pl.Series(self.dates[:end], dtype=pl.Int64).cast(
+                    pl.Datetime("us")
+                ),
+            }
+        )
+
+    def write(self, folder: Path) -> None:
+        """
+        Save the events, one segment at a time, and the tick dates, names
+        and capacities needed to read them as parquet files in `folder`,
+        see `read`
+        """
+        folder.mkdir(exist_ok=True, parents=True)
+        for segment in folder.glob("events-*.parquet"):
+            segment.unlink()
+        for i, frame in enumerate(self.frames()):
+            frame.write_parquet(folder / f"events-{i:05d}.parquet")
+        pl.DataFrame(
+            {"tick": range(len(self.tick_dates)), "date": self.tick_dates},
+            schema={"tick": pl.Int32, "date": pl.Datetime("us")},
+        ).write_parquet(folder / "ticks.parquet")
+        pl.DataFrame(
+            {"employee": range(len(self.employee_names)), "name": self.employee_names},
+            schema={"employee": pl.Int32, "name": pl.String},
+        ).write_parquet(folder / "employees.parquet")
+        pl.DataFrame(
+            {
+                "department": range(len(self.department_names)),
+                "name": self.department_names,
+                "max_capacity": self.capacities,
+            },
+            schema={
+                "department": pl.Int32,
+                "name": pl.String,
+                "max_capacity": pl.Int64,
+            },
+        ).write_parquet(folder / "departments.parquet")
+
+    @classmethod
+    def read(cls, folder: Path) -> EventLog:
+        """
+        Log saved by `write`. Its events are read like archive segments,
+        only when a report needs them, and nothing can be recorded to it.
+        """
+        log = cls()
+        log.segments = sorted(folder.glob("events-*.parquet"))
+        log.archived_events = (
+            pl.scan_parquet(log.segments).select(pl.len()).collect().item()
+        )
+        log.tick_dates = pl.read_parquet(folder / "ticks.parquet")["date"].to_list()
+        log.flushed_tick = log.tick
+        log.employee_names = pl.read_parquet(folder / "employees.parquet")[
+            "name"
+        ].to_list()
+        departments = pl.read_parquet(folder / "departments.parquet")
+        log.department_names = departments["name"].to_list()
+        log.capacities = departments["max_capacity"].to_list()
+        return log
+
+    def extend_frame(self, frame: pl.DataFrame) -> None:
+        """
+        Bulk append rows shaped like `to_frame`
+        """
+        self.ticks.extend(frame["tick"].to_list())
+        self.kinds.extend(frame["kind"].to_list())
+        self.employees.extend(frame["employee"].to_list())
+        self.departments.extend(frame["department"].to_list())
+        self.dates.extend(frame["date"].dt.epoch("us").to_list())
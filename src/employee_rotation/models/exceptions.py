@@ -4,3 +4,7 @@ class DepartmentFullException(Exception):
 
 class EmployeeNotAssignedtoDepartmentException(Exception):
     pass
+
+
+class InfeasiblePlanException(Exception):
+    pass
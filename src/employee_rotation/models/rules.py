@@ -57,6 +57,12 @@ class Rules:
             self.rules.append(rule_func)
         return self
 
+    def parameters(self, f_name: str) -> list[dict[str, Any]]:
+        """
+        Keyword arguments of every configured `f_name` rule
+        """
+        return [rule.keywords for rule in self.rules if rule.func.__name__ == f_name]
+
     @staticmethod
     def meta(
         *,
@@ -0,0 +1,272 @@
+"""
+How robust a plan is when trainings do not go by the book.
+
+Every replica samples, per employee, how long each training really takes
+(a lognormal factor around `duration_months` plus the occasional absence)
+and when the employee quits, then runs the rotation engine with those
+draws. Replicas share nothing, each one owns its clock, so they are spread
+over a process pool and summarised into per employee finish percentiles
+and per department bottleneck probabilities.
+"""
+
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+import datetime as dt
+import math
+import multiprocessing
+import random
+
+import polars as pl
+
+from employee_rotation.config import Config
+from employee_rotation.pool import SimulationSettings, simulation_pool, worker_state
+from employee_rotation.models import (
+    Employee,
+    Rules,
+    TimeSimulator,
+    TrainingDepartment,
+    rotate_employees,
+    Status,
+)
+from employee_rotation.simulation import build_model
+
+PERCENTILES = [0.1, 0.5, 0.9]
+
+
+@dataclass(frozen=True)
+class Uncertainty:
+    """
+    duration_spread: standard deviation of the log of the training length
+        factor, 0 keeps durations as configured.
+    absence_probability: chance that a training is interrupted by a leave.
+    absence_months: mean length of a leave, exponentially distributed.
+    attrition_per_year: chance an employee quits within a year.
+    """
+
+    duration_spread: float = 0.0
+    absence_probability: float = 0.0
+    absence_months: float = 0.0
+    attrition_per_year: float = 0.0
+
+    def extra_training_days(
+        self, dept: TrainingDepartment, rnd: random.Random
+    ) -> float:
+        days = 0.0
+        if self.duration_spread:
+            # Centered so the mean length stays duration_months
+            factor = rnd.lognormvariate(
+                -(self.duration_spread**2) / 2, self.duration_spread
+            )
+            days += dept.duration * (factor - 1)
+        if self.absence_months and rnd.random() < self.absence_probability:
+            days += 30 * rnd.expovariate(1 / self.absence_months)
+        return days
+
+    def quit_after_months(self, rnd: random.Random) -> float:
+        if self.attrition_per_year <= 0:
+            return math.inf
+        if self.attrition_per_year >= 1:
+            return 0.0
+        return rnd.expovariate(-math.log(1 - self.attrition_per_year) / 12)
+
+
+@dataclass
+class ReplicaOutcome:
+    """
+    finish_months: months from the origin each employee finished at, NaN
+        if they did not.
+    quit: employees who left the programme.
+    pending: per department, employees still needing it at the end.
+    """
+
+    finish_months: array
+    quit: list[bool]
+    pending: list[int]
+
+
+@dataclass
+class MonteCarloResult:
+    employees: pl.DataFrame
+    departments: pl.DataFrame
+    replicas: int
+
+
+def _leave(emp: Employee):
+    if emp.status is Status.ASSIGNED:
+        emp.current_department.remove_employee(emp)  # type: ignore
+
+
+def simulate_replica(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    rules: Rules,
+    config: Config | SimulationSettings,
+    origin: dt.datetime,
+    uncertainty: Uncertainty,
+    seed: int,
+) -> ReplicaOutcome:
+    rnd = random.Random(seed)
+    t_simulator = TimeSimulator()
+    t_simulator.pin_origin(origin)
+
+    departements, employees = build_model(departments_df, employees_df, t_simulator)
+    for emp in employees:
+        emp.extra_training_days = {
+            dept.name: uncertainty.extra_training_days(dept, rnd)
+            for dept in departements
+        }
+    quit_after = [uncertainty.quit_after_months(rnd) for _ in employees]
+
+    position = {id(emp): i for i, emp in enumerate(employees)}
+    finish_months = array("d", [math.nan] * len(employees))
+    quit = [False] * len(employees)
+    active = list(employees)
+
+    t_simulator.forward_in_future(config.delay_start_by_months)
+    for _ in range(config.rotations):
+        t_simulator.forward_in_future(config.rotation_length_in_months)
+
+        leaving = [
+            emp
+            for emp in active
+            if emp.status is not Status.FINISHED
+            and quit_after[position[id(emp)]] <= t_simulator.forwarded_months
+        ]
+        if leaving:
+            for emp in leaving:
+                _leave(emp)
+                quit[position[id(emp)]] = True
+            active = [emp for emp in active if not quit[position[id(emp)]]]
+
+        active = rotate_employees(active, departements, rules)
+        for emp in active:
+            i = position[id(emp)]
+            if emp.status is Status.FINISHED and math.isnan(finish_months[i]):
+                finish_months[i] = t_simulator.forwarded_months
+
+        if all(emp.status is Status.FINISHED for emp in active):
+            break
+
+    pending = [0] * len(departements)
+    for emp in active:
+        if emp.status is Status.FINISHED:
+            continue
+        done = {d.name for d, _, _ in emp.previous_departments} | {
+            d.name for d in emp.excluded_departments
+        }
+        for i, dept in enumerate(departements):
+            if dept.name not in done:
+                pending[i] += 1
+
+    return ReplicaOutcome(finish_months, quit, pending)
+
+
+def _replica(seed: int) -> ReplicaOutcome:
+    state = worker_state()
+    return simulate_replica(
+        state["departments_df"],
+        state["employees_df"],
+        state["rules"],
+        state["settings"],
+        state["origin"],
+        state["uncertainty"],
+        seed,
+    )
+
+
+def summarize_replicas(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    outcomes: list[ReplicaOutcome],
+    origin: dt.datetime,
+) -> MonteCarloResult:
+    """
+    Replicas where an employee did not finish count as finishing after the
+    horizon, so finish_p90 is the date 90% of the replicas finished by, and
+    is empty when fewer than 90% did.
+    """
+    samples = pl.concat(
+        pl.DataFrame(
+            {"finish_months": outcome.finish_months, "quit": outcome.quit},
+            schema={"finish_months": pl.Float64, "quit": pl.Boolean},
+        ).with_row_index("employee")
+        for outcome in outcomes
+    ).with_columns(pl.col("finish_months").fill_nan(None))
+
+    def finish_date(q: float) -> pl.Expr:
+        # Smallest finish reached by a share q of the replicas, in integers
+        # so 90% of 10 replicas is exactly the 9th
+        rank = (pl.len() * round(q * 100) + 99) // 100
+        months = pl.col("finish_months").fill_null(float("inf")).sort().get(rank - 1)
+        months = pl.when(months.is_finite()).then(months)
+        return pl.lit(origin) + pl.duration(
+            milliseconds=(months * 30 * 24 * 3600 * 1000).round().cast(pl.Int64)
+        )
+
+    employees = (
+        employees_df.select("first_name", "last_name")
+        .with_row_index("employee")
+        .join(
+            samples.group_by("employee").agg(
+                finish_probability=pl.col("finish_months").is_not_null().mean(),
+                quit_probability=pl.col("quit").mean(),
+                **{f"finish_p{q * 100:.0f}": finish_date(q) for q in PERCENTILES},
+            ),
+            on="employee",
+            how="left",
+        )
+        .drop("employee")
+    )
+
+    pending = pl.DataFrame(
+        [outcome.pending for outcome in outcomes],
+        schema=departments_df["current_department"].to_list(),
+        orient="row",
+    )
+    departments = (
+        pending.unpivot(variable_name="department", value_name="pending")
+        .group_by("department", maintain_order=True)
+        .agg(
+            bottleneck_probability=(pl.col("pending") > 0).mean(),
+            mean_pending=pl.col("pending").mean(),
+        )
+        .sort("bottleneck_probability", descending=True, maintain_order=True)
+    )
+    return MonteCarloResult(employees, departments, replicas=len(outcomes))
+
+
+def run_monte_carlo(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    config: Config,
+    uncertainty: Uncertainty,
+    replicas: int,
+    workers: int | None = None,
+    seed: int = 0,
+    origin: dt.datetime | None = None,
+) -> MonteCarloResult:
+    """
+    Run `replicas` independent sampled rotations on a process pool.
+
+    Replica seeds come from `seed` alone, results do not depend on the
+    number of workers.
+    """
+    origin = origin or dt.datetime.now()
+    rnd = random.Random(seed)
+    seeds = [rnd.getrandbits(64) for _ in range(replicas)]
+    workers = workers or multiprocessing.cpu_count()
+
+    with simulation_pool(
+        departments_df,
+        employees_df,
+        config,
+        origin,
+        workers,
+        uncertainty=uncertainty,
+    ) as pool:
+        outcomes = pool.map(
+            _replica, seeds, chunksize=max(1, replicas // (4 * workers))
+        )
+
+    return summarize_replicas(departments_df, employees_df, outcomes, origin)
@@ -0,0 +1,233 @@
+"""
+Search for employee and department priority orders that shorten the plan.
+
+`rotate_employees` hands free seats out greedily, walking employees and
+departments in list order, so the order of the input rows decides who
+waits. The optimizer anneals over both orders and lets the rotation engine
+itself score every candidate, which keeps all the configured rules in force.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+import datetime as dt
+import math
+import multiprocessing
+import queue
+import random
+import time
+
+import polars as pl
+
+from employee_rotation.config import Config
+from employee_rotation.pool import SimulationSettings, simulation_pool, worker_state
+from employee_rotation.models import (
+    Rules,
+    TimeSimulator,
+    rotate_employees,
+    Status,
+)
+from employee_rotation.simulation import build_model
+
+Order = tuple[tuple[int, ...], tuple[int, ...]]
+
+
+@dataclass(frozen=True, order=True)
+class PlanScore:
+    """
+    Months summed over employees, lower is better
+    """
+
+    total: float
+    completion: float
+    waiting: float
+
+    @staticmethod
+    def new(
+        completion: int, waiting: int, config: Config | SimulationSettings
+    ) -> "PlanScore":
+        completion_months = completion * config.rotation_length_in_months
+        waiting_months = waiting * config.rotation_length_in_months
+        return PlanScore(
+            completion_months + waiting_months, completion_months, waiting_months
+        )
+
+
+@dataclass
+class OptimizationResult:
+    """
+    The best orders found. Without any score back before the deadline the
+    input order is returned, with no `score` nor `baseline`.
+    """
+
+    departments_df: pl.DataFrame
+    employees_df: pl.DataFrame
+    score: PlanScore | None
+    baseline: PlanScore | None
+    evaluations: int
+
+
+def score_plan(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    rules: Rules,
+    config: Config | SimulationSettings,
+    origin: dt.datetime,
+) -> PlanScore:
+    """
+    Run the rotation without any reporting and measure it
+    """
+    t_simulator = TimeSimulator()
+    t_simulator.pin_origin(origin)
+
+    departements, employees = build_model(departments_df, employees_df, t_simulator)
+    t_simulator.forward_in_future(config.delay_start_by_months)
+
+    completion = 0
+    waiting = 0
+    # Without train_once_in_each_dept finished employees are assigned again
+    # and can finish more than once, only the first time counts
+    finished: set[int] = set()
+    for tick in range(config.rotations):
+        t_simulator.forward_in_future(config.rotation_length_in_months)
+        employees = rotate_employees(employees, departements, rules)
+
+        for i, emp in enumerate(employees):
+            if emp.status is Status.WAITING_REASSIGNMENT:
+                waiting += 1
+            elif emp.status is Status.FINISHED and i not in finished:
+                completion += tick + 1
+                finished.add(i)
+
+        if len(finished) == len(employees):
+            break
+
+    completion += (len(employees) - len(finished)) * config.rotations
+    return PlanScore.new(completion, waiting, config)
+
+
+def apply_order(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    order: Order,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    employees_order, departments_order = order
+    return departments_df[list(departments_order)], employees_df[list(employees_order)]
+
+
+def _evaluate(order: Order) -> PlanScore:
+    state = worker_state()
+    return score_plan(
+        *apply_order(state["departments_df"], state["employees_df"], order),
+        state["rules"],
+        state["settings"],
+        state["origin"],
+    )
+
+
+def neighbour(order: Order, rnd: random.Random) -> Order:
+    """
+    Move one employee to another priority, or swap two departments
+    """
+    employees_order, departments_order = order
+    if len(departments_order) > 1 and (len(employees_order) < 2 or rnd.random() < 0.2):
+        departments = list(departments_order)
+        i, j = rnd.sample(range(len(departments)), 2)
+        departments[i], departments[j] = departments[j], departments[i]
+        return employees_order, tuple(departments)
+
+    if len(employees_order) < 2:
+        return order
+    employees = list(employees_order)
+    i, j = rnd.sample(range(len(employees)), 2)
+    employees.insert(j, employees.pop(i))
+    return tuple(employees), departments_order
+
+
+def optimize_rotation_order(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    config: Config,
+    budget_seconds: float,
+    workers: int | None = None,
+    seed: int = 0,
+    origin: dt.datetime | None = None,
+) -> OptimizationResult:
+    """
+    Simulated annealing over priority orders within a wall clock budget.
+
+    The input order is scored on the pool like any other candidate, and
+    every worker always has an order to evaluate. Each score is accepted as
+    it comes in, a worse one with the usual Metropolis probability, and the
+    freed worker gets a new neighbour. At the deadline the evaluations
+    still running are abandoned. An order only replaces the input one once
+    the input order's own score came back and it is no worse.
+    """
+    deadline = time.monotonic() + budget_seconds
+    rnd = random.Random(seed)
+    origin = origin or dt.datetime.now()
+    workers = workers or multiprocessing.cpu_count()
+
+    identity: Order = (
+        tuple(range(employees_df.height)),
+        tuple(range(departments_df.height)),
+    )
+    current = best = identity
+    current_score: PlanScore | None = None
+    best_score: PlanScore | None = None
+    baseline: PlanScore | None = None
+    temperature = 0.0
+    evaluations = 0
+
+    pool = simulation_pool(departments_df, employees_df, config, origin, workers)
+    results: queue.SimpleQueue = queue.SimpleQueue()
+
+    def submit(order: Order):
+        pool.apply_async(
+            _evaluate,
+            (order,),
+            callback=lambda score: results.put((order, score)),
+            error_callback=results.put,
+        )
+
+    try:
+        submit(identity)
+        for _ in range(workers - 1):
+            submit(neighbour(identity, rnd))
+
+        while (timeout := deadline - time.monotonic()) > 0:
+            try:
+                result = results.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if isinstance(result, BaseException):
+                raise result
+            order, score = result
+            evaluations += 1
+            if order == identity and baseline is None:
+                baseline = score
+            if current_score is None:
+                temperature = 0.05 * score.total / max(employees_df.height, 1)
+                current, current_score = order, score
+
+            cooling = max(deadline - time.monotonic(), 0) / budget_seconds
+            delta = score.total - current_score.total
+            if delta <= 0 or rnd.random() < math.exp(
+                -delta / max(temperature * cooling, 1e-9)
+            ):
+                current, current_score = order, score
+            if best_score is None or score < best_score:
+                best, best_score = order, score
+
+            submit(neighbour(current, rnd))
+    finally:
+        # Kills the workers, the evaluations still running are abandoned
+        pool.terminate()
+
+    if baseline is None:
+        best, best_score = identity, None
+    return OptimizationResult(
+        *apply_order(departments_df, employees_df, best),
+        score=best_score,
+        baseline=baseline,
+        evaluations=evaluations,
+    )
@@ -0,0 +1,97 @@
+"""
+Process pools running rotations of one roster.
+
+Workers are spawned, not forked, and get the roster and the resolved
+settings once when they start.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any
+import datetime as dt
+import multiprocessing
+import multiprocessing.pool
+
+import polars as pl
+
+from employee_rotation.config import Config
+from employee_rotation.models import Rules
+
+
+@dataclass(frozen=True)
+class SimulationSettings:
+    """
+    What a rotation needs from a `Config`, resolved to plain values.
+
+    `Config` keeps its settings as class attributes, a pickled instance
+    carries none of them and a spawned worker would read the defaults of
+    the class it imports. Process pools send this instead.
+    """
+
+    rotations: int
+    delay_start_by_months: float
+    rotation_length_in_months: float
+    rules: tuple
+
+    @staticmethod
+    def new(config: Config) -> "SimulationSettings":
+        return SimulationSettings(
+            rotations=config.rotations,
+            delay_start_by_months=config.delay_start_by_months,
+            rotation_length_in_months=config.rotation_length_in_months,
+            rules=tuple(config.rules),
+        )
+
+
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    settings: SimulationSettings,
+    origin: dt.datetime,
+    extra: dict[str, Any],
+):
+    _worker.update(
+        departments_df=departments_df,
+        employees_df=employees_df,
+        rules=Rules().add_rules(list(settings.rules)),
+        settings=settings,
+        origin=origin,
+        **extra,
+    )
+
+
+def worker_state() -> dict[str, Any]:
+    """
+    What `simulation_pool` handed the current worker process: the roster
+    frames, the rules and settings, the origin and the `extra` values
+    """
+    return _worker
+
+
+def simulation_pool(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    config: Config,
+    origin: dt.datetime,
+    workers: int,
+    **extra: Any,
+) -> multiprocessing.pool.Pool:
+    """
+    Process pool whose workers get the roster and the settings of `config`
+    once, at start up, for the tasks to read with `worker_state`
+    """
+    # polars is multithreaded, forking it can deadlock
+    return multiprocessing.get_context("spawn").Pool(
+        workers,
+        initializer=_init_worker,
+        initargs=(
+            departments_df,
+            employees_df,
+            SimulationSettings.new(config),
+            origin,
+            extra,
+        ),
+    )
@@ -0,0 +1,334 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Iterator
+import datetime as dt
+
+import polars as pl
+
+from employee_rotation.models import (
+    Status,
+    EventLog,
+    EventKind,
+    NO_DEPARTMENT,
+)
+
+
+@dataclass
+class DepartmentRotation:
+    """
+    What a department looked like at the end of a rotation with movement
+    """
+
+    date: dt.datetime
+    name: str
+    members: list[str]
+    max_capacity: int
+    waiting_reassignment: int
+    rotation_movement: str
+
+    @property
+    def current_capacity(self) -> int:
+        return len(self.members)
+
+
+@dataclass
+class EmployeeRotation:
+    full_name: str
+    status: Status
+    department: str
+
+
+@dataclass
+class RotationSnapshot:
+    """
+    Everything needed to render one rotation block of the plan
+    """
+
+    departments: list[DepartmentRotation] = field(default_factory=list)
+    employees: list[EmployeeRotation] = field(default_factory=list)
+    training: int = 0
+    waiting_reassignment: int = 0
+    finished: int = 0
+    max_capacity: int = 0
+
+
+def replay_snapshots(log: EventLog) -> Iterator[RotationSnapshot]:
+    """
+    Rebuild the end of tick state of every tick from the event log
+    """
+    members: list[list[int]] = [[] for _ in log.department_names]
+    waiting = [0] * len(log.department_names)
+    finished = [0] * len(log.department_names)
+    status = [Status.ASSIGNED] * len(log.employee_names)
+    current = [NO_DEPARTMENT] * len(log.employee_names)
+    last = [NO_DEPARTMENT] * len(log.employee_names)
+    max_capacity = sum(log.capacities)
+
+    # Departments keep track of the people who left them until they are
+    # assigned elsewhere, split by waiting and finished.
+    def leave(emp: int):
+        if status[emp] is Status.WAITING_REASSIGNMENT:
+            waiting[last[emp]] -= 1
+        elif status[emp] is Status.FINISHED:
+            finished[last[emp]] -= 1
+
+    def enter(emp: int):
+        if status[emp] is Status.WAITING_REASSIGNMENT:
+            waiting[last[emp]] += 1
+        elif status[emp] is Status.FINISHED:
+            finished[last[emp]] += 1
+
+    # Archived segments are read one at a time
+    events = chain.from_iterable(
+        frame.select("tick", "kind", "employee", "department").iter_rows()
+        for frame in log.frames()
+    )
+    event = next(events, None)
+    for tick, date in enumerate(log.tick_dates):
+        movement: dict[int, str] = {}
+        changed: set[int] = set()
+        while event is not None and event[0] == tick:
+            _, kind, emp, dept = event
+            event = next(events, None)
+            if kind == EventKind.EXCLUDE:
+                continue
+
+            changed.add(emp)
+            leave(emp)
+            match kind:
+                case EventKind.ASSIGN:
+                    members[dept].append(emp)
+                    movement[dept] = movement.get(dept, "") + "+"
+                    if current[emp] != NO_DEPARTMENT:
+                        last[emp] = current[emp]
+                    current[emp] = dept
+                    status[emp] = Status.ASSIGNED
+                case EventKind.REMOVE:
+                    members[dept].remove(emp)
+                    movement[dept] = movement.get(dept, "") + "-"
+                    last[emp] = current[emp]
+                    current[emp] = NO_DEPARTMENT
+                    status[emp] = Status.WAITING_REASSIGNMENT
+                case EventKind.FINISH:
+                    status[emp] = Status.FINISHED
+            enter(emp)
+
+        yield RotationSnapshot(
+            departments=[
+                DepartmentRotation(
+                    date=date,
+                    name=log.department_names[dept],
+                    members=[log.employee_names[emp] for emp in members[dept]],
+                    max_capacity=log.capacities[dept],
+                    waiting_reassignment=waiting[dept],
+                    rotation_movement=movement[dept],
+                )
+                for dept in sorted(movement)
+            ],
+            employees=[
+                EmployeeRotation(
+                    log.employee_names[emp],
+                    status[emp],
+                    _employee_department(log, status[emp], current[emp], last[emp]),
+                )
+                for emp in sorted(changed)
+            ],
+            training=sum(len(dept) for dept in members),
+            waiting_reassignment=sum(waiting),
+            finished=sum(finished),
+            max_capacity=max_capacity,
+        )
+
+
+def _employee_department(log: EventLog, status: Status, current: int, last: int) -> str:
+    match status:
+        case Status.WAITING_REASSIGNMENT:
+            return log.department_names[last if last != NO_DEPARTMENT else current]
+        case Status.ASSIGNED:
+            return log.department_names[current]
+        case Status.FINISHED:
+            return "Finished"
+        case _:
+            raise NotImplementedError("Status case not implemented")
+
+
+def produce_rotation_output(snapshot: RotationSnapshot, lines: list[str]):
+    departements_formating = format_depatements_output(snapshot.departments)
+    lines.extend(departements_formating)
+    lines.extend(format_employees_output(snapshot.employees))
+
+    if len(departements_formating):
+        lines.extend(format_departments_summary_output(snapshot))
+
+        lines.append("\n")
+        lines.append("-----" * 20)
+
+
+def format_employees_output(
+    employees: list[EmployeeRotation],
+) -> list[str]:
+    """
+    Helper function for output formatting for employees
+    """
+    lines = []
+    for emp in employees:
+        match emp.status:
+            case Status.WAITING_REASSIGNMENT:
+                indicator = "<-"
+                action = "Waiting Reassignment"
+
+            case Status.ASSIGNED:
+                indicator = "->"
+                action = "Assigned"
+
+            case Status.FINISHED:
+                indicator = "**"
+                action = "Training Completed"
+
+            case _:
+                raise NotImplementedError("Status case not implemented")
+
+        message = f"{action.rjust(32)}: {emp.full_name.ljust(30, '.')} {indicator} {emp.department}"
+
+        lines.append(message)
+
+    return lines
+
+
+def format_depatements_output(departements: list[DepartmentRotation]) -> list[str]:
+    """
+    Helper function for output formatting for departements
+    """
+
+    lines = []
+    for dept in sorted(departements, key=lambda dept: dept.max_capacity):
+        lines.append(
+            f"{dept.date.strftime('%Y-%m')} "
+            f"{dept.name.rjust(16)} "
+            f"({dept.current_capacity}/{dept.max_capacity}/{dept.waiting_reassignment}): "
+            f"{sorted(dept.members)} "
+            f"({dept.rotation_movement.count('-')}-/"
+            f"{dept.rotation_movement.count('+')}+)"
+        )
+    return lines
+
+
+def format_departments_summary_output(
+    snapshot: RotationSnapshot,
+) -> list[str]:
+    lines = []
+    summary = (
+        "\n"
+        f"{'Departments summary'.rjust(32)}:"
+        f" {snapshot.training} Training /"
+        f" {snapshot.waiting_reassignment} Waiting Reassignment /"
+        f" {snapshot.finished} Finished /"
+        f" {snapshot.max_capacity} Max Capacity "
+    )
+    lines.append(summary)
+    return lines
+
+
+def training_stints(
+    log: EventLog, events: pl.DataFrame | pl.LazyFrame | None = None
+) -> pl.DataFrame:
+    """
+    Every assignment with the event that ended it, a removal or being
+    assigned somewhere else. Trainings still running at the end of the plan
+    have no end. `events` is the frame of `log` when the caller already has
+    it, otherwise the log is scanned.
+    """
+    tick_dates = pl.LazyFrame(
+        {"end_tick": range(len(log.tick_dates)), "tick_date": log.tick_dates},
+        schema={"end_tick": pl.Int32, "tick_date": pl.Datetime("us")},
+    )
+    names = pl.LazyFrame(
+        {"employee": range(len(log.employee_names)), "name": log.employee_names},
+        schema={"employee": pl.Int32, "name": pl.String},
+    )
+    departments = pl.LazyFrame(
+        {
+            "department": range(len(log.department_names)),
+            "department_name": log.department_names,
+        },
+        schema={"department": pl.Int32, "department_name": pl.String},
+    )
+
+    return (
+        (log.scan() if events is None else events.lazy())
+        .with_row_index("seq")
+        .filter(pl.col("kind").is_in([EventKind.ASSIGN, EventKind.REMOVE]))
+        .sort("employee", "seq")
+        .with_columns(
+            pl.col("kind", "tick", "date")
+            .shift(-1)
+            .over("employee")
+            .name.prefix("end_")
+        )
+        .filter(pl.col("kind") == EventKind.ASSIGN)
+        .join(tick_dates, on="end_tick", how="left")
+        .join(names, on="employee")
+        .join(departments, on="department")
+        .sort("employee", "seq")
+        .select(
+            "employee",
+            "name",
+            department=pl.col("department_name"),
+            start=pl.col("date"),
+            end=pl.when(pl.col("end_kind") == EventKind.REMOVE)
+            .then(pl.col("end_date"))
+            .otherwise(pl.col("tick_date")),
+        )
+        .collect()
+    )
+
+
+def employees_training_plan(
+    log: EventLog,
+    employees_df: pl.DataFrame | None = None,
+    stints: pl.DataFrame | None = None,
+) -> list[str]:
+    """
+    One line per finished training, including the ones listed in the
+    `history` column of `employees_df` for a warm started plan. `stints`
+    are the `training_stints` of `log` when the caller already has them.
+    """
+    stints = (training_stints(log) if stints is None else stints).filter(
+        pl.col("end").is_not_null()
+    )
+    if employees_df is not None and "history" in employees_df.columns:
+        past = (
+            employees_df.select("history")
+            .with_row_index("employee")
+            .explode("history")
+            .drop_nulls("history")
+            .unnest("history")
+            .select(
+                pl.col("employee").cast(pl.Int32),
+                name=pl.col("employee").replace_strict(
+                    dict(enumerate(log.employee_names)), return_dtype=pl.String
+                ),
+                department="department",
+                start=pl.col("start").cast(pl.Datetime("us")),
+                end=pl.col("end").cast(pl.Datetime("us")),
+            )
+        )
+        stints = pl.concat([past, stints]).sort(
+            "employee", "start", maintain_order=True
+        )
+
+    return (
+        stints.select(
+            pl.concat_str(
+                (pl.col("employee") + 1).cast(pl.String),
+                pl.col("name"),
+                pl.col("department"),
+                pl.col("start").dt.strftime("%Y-%m"),
+                pl.col("end").dt.strftime("%Y-%m"),
+                separator=",",
+            )
+        )
+        .to_series()
+        .to_list()
+    )
@@ -0,0 +1,231 @@
+"""
+Render every output of a run side by side.
+
+Each report is a function writing one file from the run's event log.
+They are independent, so they run on a thread pool: the polars based ones
+release the GIL while they work, and a slow report only delays itself.
+The frames several reports need are built once per run by `RunTables`.
+"""
+
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, TypeVar
+import threading
+
+import polars as pl
+
+from employee_rotation.analytics import (
+    department_summary,
+    department_utilization,
+    finish_times,
+    waiting_spells,
+)
+from employee_rotation.data import write_data
+from employee_rotation.report import employees_training_plan, training_stints
+from employee_rotation.simulation import SimulationRun
+
+T = TypeVar("T")
+
+
+class RunTables:
+    """
+    Frames shared by the reports of one run, each built once on first use.
+
+    The event log is turned into a frame once and every table is derived
+    from it. A log with an archive is scanned instead, so the segments of
+    a rolling horizon run are never all loaded at once. Reports on other
+    threads asking for a table being built wait for it instead of building
+    it again. Each caller gets its own clone of the table, polars frames
+    cannot be read by several threads at the same time.
+    """
+
+    def __init__(self, run: SimulationRun) -> None:
+        self.run = run
+        self._lock = threading.Lock()
+        self._tables: dict[str, Future] = {}
+
+    def _table(self, name: str, build: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._tables.get(name)
+            owner = future is None
+            if owner:
+                future = self._tables[name] = Future()
+        if owner:
+            try:
+                future.set_result(build())
+            except Exception as e:
+                future.set_exception(e)
+        return future.result().clone()
+
+    @property
+    def events(self) -> pl.DataFrame | pl.LazyFrame:
+        if self.run.events.segments:
+            return self.run.events.scan()
+        return self._table("events", self.run.events.to_frame)
+
+    @property
+    def utilization(self) -> pl.DataFrame:
+        return self._table(
+            "utilization", lambda: department_utilization(self.run.events, self.events)
+        )
+
+    @property
+    def stints(self) -> pl.DataFrame:
+        return self._table(
+            "stints", lambda: training_stints(self.run.events, self.events)
+        )
+
+    @property
+    def waiting(self) -> pl.DataFrame:
+        return self._table(
+            "waiting", lambda: waiting_spells(self.run.events, self.events)
+        )
+
+    @property
+    def finished(self) -> pl.DataFrame:
+        return self._table(
+            "finished", lambda: finish_times(self.run.events, self.events)
+        )
+
+
+Report = Callable[[RunTables, Path], Path]
+
+
+def plan_report(tables: RunTables, folder: Path) -> Path:
+    file = folder / "plan.txt"
+    write_data(file, tables.run.iter_lines())
+    return file
+
+
+def plan_per_employee_report(tables: RunTables, folder: Path) -> Path:
+    file = folder / "plan_per_emp.txt"
+    write_data(
+        file,
+        employees_training_plan(
+            tables.run.events, tables.run.employees_df, tables.stints
+        ),
+        clean=True,
+    )
+    return file
+
+
+def utilization_report(tables: RunTables, folder: Path) -> Path:
+    file = folder / "utilization.csv"
+    tables.utilization.write_csv(file)
+    return file
+
+
+def department_rosters_report(tables: RunTables, folder: Path) -> Path:
+    """
+    Who trains in each department and when
+    """
+    file = folder / "department_rosters.csv"
+    tables.stints.sort("department", "start", maintain_order=True).select(
+        "department", "name", "start", "end"
+    ).write_csv(file, datetime_format="%Y-%m-%d")
+    return file
+
+
+def employee_timelines_report(tables: RunTables, folder: Path) -> Path:
+    """
+    Trainings and waiting periods of each employee, in order
+    """
+    file = folder / "employee_timelines.csv"
+    stints = tables.stints.with_columns(activity=pl.lit("training"))
+    waiting = tables.waiting.join(
+        stints.select("employee", "name").unique("employee"), on="employee"
+    ).with_columns(activity=pl.lit("waiting"))
+    columns = ["employee", "name", "activity", "department", "start", "end"]
+    pl.concat([stints.select(columns), waiting.select(columns)]).sort(
+        "employee", "start", maintain_order=True
+    ).with_columns(pl.col("employee") + 1).write_csv(file, datetime_format="%Y-%m-%d")
+    return file
+
+
+def summary_report(tables: RunTables, folder: Path) -> Path:
+    """
+    One row per department
+    """
+    file = folder / "summary.csv"
+    department_summary(tables.utilization).write_csv(file)
+    return file
+
+
+def roster_summary_report(tables: RunTables, folder: Path) -> Path:
+    """
+    One row for the whole roster: how many finished and how fast
+    """
+    file = folder / "roster_summary.csv"
+    finished = tables.finished
+    pl.DataFrame(
+        {
+            "employees": [finished.height],
+            "finished": [finished["finish"].count()],
+            "median_months_to_finish": [finished["months"].median()],
+        },
+        schema={
+            "employees": pl.UInt32,
+            "finished": pl.UInt32,
+            "median_months_to_finish": pl.Float64,
+        },
+    ).write_csv(file)
+    return file
+
+
+def events_report(tables: RunTables, folder: Path) -> Path:
+    """
+    The event log itself, every report can be written again from it with
+    `EventLog.read` instead of rerunning the plan
+    """
+    path = folder / "event_log"
+    tables.run.events.write(path)
+    return path
+
+
+REPORTS: dict[str, Report] = {
+    "plan": plan_report,
+    "plan_per_emp": plan_per_employee_report,
+    "utilization": utilization_report,
+    "department_rosters": department_rosters_report,
+    "employee_timelines": employee_timelines_report,
+    "summary": summary_report,
+    "roster_summary": roster_summary_report,
+    "events": events_report,
+}
+
+
+def write_reports(
+    run: SimulationRun,
+    folder: Path,
+    reports: list[str] | None = None,
+    workers: int | None = None,
+) -> dict[str, Path]:
+    """
+    Write the `reports` (all of them by default) concurrently, sharing
+    the tables they have in common.
+
+    Every report gets to finish even when another one fails, the failures
+    are raised together afterwards.
+    """
+    names = list(REPORTS) if reports is None else reports
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        raise ValueError(
+            f"{', '.join(unknown)} is not a valid report. please change your configration"
+        )
+
+    tables = RunTables(run)
+    written: dict[str, Path] = {}
+    errors: list[Exception] = []
+    with ThreadPoolExecutor(max_workers=workers or len(names) or 1) as pool:
+        futures = {pool.submit(REPORTS[name], tables, folder): name for name in names}
+        for future in as_completed(futures):
+            try:
+                written[futures[future]] = future.result()
+            except Exception as e:
+                errors.append(e)
+
+    if errors:
+        raise ExceptionGroup("some reports could not be written", errors)
+    return {name: written[name] for name in names}
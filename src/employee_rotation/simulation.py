@@ -0,0 +1,391 @@
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Iterator
+import datetime as dt
+import pickle
+import threading
+import time
+
+import polars as pl
+
+from employee_rotation.config import Config
+from employee_rotation.models import (
+    TrainingDepartment,
+    Employee,
+    Rules,
+    TimeSimulator,
+    rotate_employees,
+    Status,
+    EventLog,
+)
+from employee_rotation.report import replay_snapshots, produce_rotation_output
+
+
+@dataclass
+class SimulationRun:
+    """
+    Result of a rotation run, kept around so the next run can resume from it.
+
+    events is the only record of what happened, every report is derived
+    from it. Its tick 0 is the roster before any rotation, tick n + 1 the
+    state after rotation n. checkpoints map a rotation to the captured
+    state right before it was simulated. stopped tells why a run ended
+    before its last rotation, its events then hold the partial plan.
+    """
+
+    departments_df: pl.DataFrame
+    employees_df: pl.DataFrame
+    origin: dt.datetime
+    settings: tuple
+    departements: list[TrainingDepartment] = field(default_factory=list)
+    employees: list[Employee] = field(default_factory=list)
+    events: EventLog = field(default_factory=EventLog)
+    checkpoints: dict[int, bytes] = field(default_factory=dict)
+    stopped: str | None = None
+
+    def lines(self) -> list[str]:
+        return list(self.iter_lines())
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        The plan one rotation block at a time
+        """
+        for snapshot in replay_snapshots(self.events):
+            lines: list[str] = []
+            produce_rotation_output(snapshot, lines)
+            yield from lines
+
+
+@dataclass(frozen=True)
+class Progress:
+    tick: int
+    rotations: int
+    active_trainees: int
+    ticks_per_second: float
+    elapsed_seconds: float
+
+
+@dataclass
+class RunControl:
+    """
+    Budget, progress reporting and cancellation of a rotation run.
+
+    The run stops before the next rotation once `budget_seconds` of wall
+    clock or `max_ticks` rotations are spent, or when `cancel` was called
+    from another thread or a signal handler. `on_progress` is called every
+    `progress_every_ticks` rotations and once when the run ends.
+    """
+
+    budget_seconds: float | None = None
+    max_ticks: int | None = None
+    on_progress: Callable[[Progress], None] | None = None
+    progress_every_ticks: int = 12
+    cancelled: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def stop_reason(self, ticks: int, elapsed: float) -> str | None:
+        if self.cancelled.is_set():
+            return "cancelled"
+        if self.budget_seconds is not None and elapsed >= self.budget_seconds:
+            return "time budget"
+        if self.max_ticks is not None and ticks >= self.max_ticks:
+            return "tick budget"
+        return None
+
+
+def run_settings(config: Config) -> tuple:
+    """
+    Configuration values that must match for two runs to share history
+    """
+    return (
+        config.delay_start_by_months,
+        config.rotation_length_in_months,
+        config.rotations,
+        config.checkpoint_every_rotations,
+        repr(config.rules),
+    )
+
+
+def build_model(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    t_simulator: TimeSimulator,
+    event_log: EventLog | None = None,
+) -> tuple[list[TrainingDepartment], list[Employee]]:
+    departements: list[TrainingDepartment] = []
+    employees: list[Employee] = []
+
+    for row in departments_df.iter_rows():
+        dept = TrainingDepartment(*row)
+        dept.time_simulator = t_simulator
+        dept.event_log = event_log
+        departements.append(dept)
+
+    if event_log is not None:
+        event_log.bind(departements)
+
+    for row in employees_df.iter_rows():
+        emp = Employee.new(row, departments=departements)
+        emp.time_simulator = t_simulator
+        emp.event_log = event_log
+        employees.append(emp)
+
+    return departements, employees
+
+
+def capture_state(
+    departements: list[TrainingDepartment],
+    employees: list[Employee],
+    t_simulator: TimeSimulator,
+) -> bytes:
+    """
+    Flatten the object graph into index based tuples.
+
+    Pickling the dataclasses directly recurses through every
+    employee <-> department reference and blows the stack on big rosters.
+    """
+    dept_index = {id(dept): i for i, dept in enumerate(departements)}
+    emp_index = {id(emp): i for i, emp in enumerate(employees)}
+
+    depts = [
+        (
+            dept.name,
+            dept.duration_months,
+            dept.max_capacity,
+            [emp_index[id(emp)] for emp in dept.employees],
+            [emp_index[id(emp)] for emp in dept.non_training_employees],
+        )
+        for dept in departements
+    ]
+    emps = [
+        (
+            emp.first_name,
+            emp.last_name,
+            emp.sexe,
+            (
+                None
+                if emp.current_department is None
+                else dept_index[id(emp.current_department)]
+            ),
+            emp.start_date,
+            [
+                (dept_index[id(d)], start, end)
+                for d, start, end in emp.previous_departments
+            ],
+            [dept_index[id(d)] for d in emp.excluded_departments],
+            emp.status.name,
+        )
+        for emp in employees
+    ]
+    return pickle.dumps((t_simulator.forwarded_months, depts, emps))
+
+
+def restore_state(
+    state: bytes,
+    t_simulator: TimeSimulator,
+) -> tuple[list[TrainingDepartment], list[Employee]]:
+    forwarded_months, depts, emps = pickle.loads(state)
+    t_simulator.forwarded_months = forwarded_months
+
+    departements = [
+        TrainingDepartment(name, duration, capacity, time_simulator=t_simulator)
+        for name, duration, capacity, _, _ in depts
+    ]
+    employees = []
+    for first, last, sexe, current, start, previous, excluded, status in emps:
+        emp = Employee(
+            first_name=first,
+            last_name=last,
+            sexe=sexe,
+            start_date=start,
+            previous_departments=[(departements[d], s, e) for d, s, e in previous],
+            excluded_departments=[departements[d] for d in excluded],
+            time_simulator=t_simulator,
+            _status=Status[status],
+        )
+        if current is not None:
+            emp._current_department = departements[current]
+        employees.append(emp)
+
+    for dept, (_, _, _, members, non_training) in zip(departements, depts):
+        dept.employees = [employees[i] for i in members]
+        dept.non_training_employees = {employees[i] for i in non_training}
+
+    return departements, employees
+
+
+def attach_event_log(
+    event_log: EventLog,
+    departements: list[TrainingDepartment],
+    employees: list[Employee],
+):
+    """
+    Record further changes of restored objects into `event_log`
+    """
+    for obj in (*departements, *employees):
+        obj.event_log = event_log
+    event_log.bind(departements, employees)
+
+
+def evict_finished(
+    departements: list[TrainingDepartment],
+    employees: list[Employee],
+    rules: Rules,
+    event_log: EventLog | None = None,
+) -> list[Employee]:
+    """
+    Drop the employees no rotation can change anymore.
+
+    That is the finished ones with no department, that trained in or are
+    excluded from every department. Only safe when `train_once_in_each_dept`
+    keeps them from being assigned again.
+    """
+    if not rules.parameters("train_once_in_each_dept"):
+        return employees
+    names = {dept.name for dept in departements}
+    seated = {id(emp) for dept in departements for emp in dept.employees}
+
+    kept = []
+    for emp in employees:
+        done = {dept.name for dept, _, _ in emp.previous_departments}
+        done.update(dept.name for dept in emp.excluded_departments)
+        if (
+            emp.status is not Status.FINISHED
+            or emp.current_department is not None
+            or id(emp) in seated
+            or done != names
+        ):
+            kept.append(emp)
+            continue
+        for dept in departements:
+            dept.non_training_employees.discard(emp)
+        if event_log is not None:
+            event_log.forget(emp)
+    return kept
+
+
+def run_rotations(
+    run: SimulationRun,
+    departements: list[TrainingDepartment],
+    employees: list[Employee],
+    rules: Rules,
+    config: Config,
+    t_simulator: TimeSimulator,
+    start: int = 0,
+    checkpoints: bool = False,
+    control: RunControl | None = None,
+) -> SimulationRun:
+    """
+    Simulate ticks `start` onwards, appending events and checkpoints to `run`
+
+    With a `rolling_horizon_rotations` window, every window the finished
+    employees are evicted and, when the log has an archive, the events so
+    far are flushed to it, so memory stays flat however long the plan is.
+    """
+    control = control or RunControl()
+    began = time.monotonic()
+
+    def report():
+        if control.on_progress is None:
+            return
+        elapsed = time.monotonic() - began
+        done = run.events.tick - start
+        control.on_progress(
+            Progress(
+                tick=run.events.tick,
+                rotations=config.rotations,
+                active_trainees=sum(dept.current_capacity for dept in departements),
+                ticks_per_second=done / elapsed if elapsed else 0.0,
+                elapsed_seconds=elapsed,
+            )
+        )
+
+    window = config.rolling_horizon_rotations
+    for tick in range(start, config.rotations):
+        run.stopped = control.stop_reason(tick - start, time.monotonic() - began)
+        if run.stopped:
+            break
+        every = control.progress_every_ticks
+        if every and tick > start and (tick - start) % every == 0:
+            report()
+        if window and tick > start and tick % window == 0:
+            if run.events.archive is not None:
+                run.events.flush(run.events.tick)
+            employees = evict_finished(departements, employees, rules, run.events)
+
+        if checkpoints and tick % config.checkpoint_every_rotations == 0:
+            run.checkpoints[tick] = capture_state(departements, employees, t_simulator)
+
+        t_simulator.forward_in_future(config.rotation_length_in_months)
+        run.events.advance(t_simulator.now())
+        employees = rotate_employees(employees, departements, rules)
+    report()
+
+    if checkpoints and not run.stopped:
+        run.checkpoints[config.rotations] = capture_state(
+            departements, employees, t_simulator
+        )
+    run.departements = departements
+    run.employees = employees
+    return run
+
+
+def run_simulation(
+    departments_df: pl.DataFrame,
+    employees_df: pl.DataFrame,
+    rules: Rules,
+    config: Config,
+    origin: dt.datetime | None = None,
+    checkpoints: bool = False,
+    archive: Path | None = None,
+    control: RunControl | None = None,
+) -> SimulationRun:
+    """
+    Simulate a roster from scratch. With `checkpoints` the state is captured
+    every `checkpoint_every_rotations` so incremental re-planning can resume
+    a stopped run. With an `archive` folder the event log is flushed there
+    during a rolling horizon run.
+    """
+    t_simulator = TimeSimulator()
+    run = SimulationRun(
+        departments_df=departments_df,
+        employees_df=employees_df,
+        origin=t_simulator.pin_origin(origin),
+        settings=run_settings(config),
+        events=EventLog(archive),
+    )
+
+    # Before ratation
+    run.events.advance(t_simulator.now())
+    departements, employees = build_model(
+        departments_df, employees_df, t_simulator, run.events
+    )
+
+    # start delayed by month
+    t_simulator.forward_in_future(config.delay_start_by_months)
+
+    return run_rotations(
+        run,
+        departements,
+        employees,
+        rules,
+        config,
+        t_simulator,
+        checkpoints=checkpoints,
+        control=control,
+    )
+
+
+def save_run(file: Path, run: SimulationRun):
+    with open(file, "wb") as f:
+        pickle.dump(replace(run, departements=[], employees=[]), f)
+
+
+def load_run(file: Path) -> SimulationRun | None:
+    if not file.exists():
+        return None
+    with open(file, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,84 @@
+from employee_rotation.config import Config
+from employee_rotation.models import Rules
+from employee_rotation.simulation import run_simulation
+from collections import Counter
+from datetime import datetime as dt
+
+import polars as pl
+import pytest
+
+DURATIONS = {"Finance": 12, "Imports": 6, "Immobilisations": 9}
+
+
+def roster_frames(
+    headcount: int = 9,
+    capacity: int | None = 3,
+    durations: dict[str, int] = DURATIONS,
+    year: int = 2023,
+    start_date: dt | None = None,
+    rows: list[tuple] | None = None,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Departments and employees frames.
+
+    Employee i works in the i-th department in turn, alternates gender and
+    was hired on `start_date`, or the first of month i of `year`. `rows`
+    replaces those employees. Without `capacity` every staffed department
+    has as many seats as employees, like `load_data`.
+    """
+    sections = list(durations)
+    if rows is None:
+        rows = [
+            (
+                f"EMP{i}",
+                "BEGHOURA",
+                "MF"[i % 2],
+                start_date or dt(year, 1 + i % 12, 1),
+                sections[i % len(sections)],
+            )
+            for i in range(headcount)
+        ]
+    employees = pl.DataFrame(
+        rows,
+        schema=[
+            "first_name",
+            "last_name",
+            "gender",
+            "start_date",
+            "current_department",
+        ],
+        orient="row",
+    )
+    headcounts = Counter(row[4] for row in rows)
+    departments = pl.DataFrame(
+        [
+            (name, duration, headcounts[name] if capacity is None else capacity)
+            for name, duration in durations.items()
+            if capacity is not None or name in headcounts
+        ],
+        schema=["current_department", "duration_months", "max_capacity"],
+        orient="row",
+    )
+    return departments, employees
+
+
+@pytest.fixture()
+def make_roster():
+    return roster_frames
+
+
+@pytest.fixture()
+def config(tmp_path):
+    class TestConfig(Config):
+        INPUT_FOLDER = tmp_path
+        OUTPUT_FOLDER = tmp_path
+        rotations = 48
+        checkpoint_every_rotations = 6
+
+    return TestConfig()
+
+
+@pytest.fixture()
+def run(config):
+    rules = Rules().add_rules(config.rules)
+    return run_simulation(*roster_frames(), rules, config, origin=dt(2025, 3, 1))
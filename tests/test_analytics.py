@@ -0,0 +1,54 @@
+from employee_rotation.analytics import (
+    department_summary,
+    department_utilization,
+    distribution,
+    finish_times,
+    utilization_matrix,
+    waiting_spells,
+)
+from employee_rotation.report import replay_snapshots
+
+import polars as pl
+
+
+def test_utilization_matches_replayed_plan(run):
+    utilization = department_utilization(run.events)
+
+    assert utilization.height == len(run.events.tick_dates) * 3
+    for tick, snapshot in enumerate(replay_snapshots(run.events)):
+        rows = utilization.filter(pl.col("tick") == tick)
+        assert rows["occupancy"].sum() == snapshot.training
+        assert rows["waiting"].sum() == snapshot.waiting_reassignment
+        assert rows["finished"].sum() == snapshot.finished
+        for dept in snapshot.departments:
+            row = rows.filter(pl.col("department") == dept.name).row(0, named=True)
+            assert row["occupancy"] == dept.current_capacity
+            assert row["waiting"] == dept.waiting_reassignment
+
+
+def test_utilization_matrix_and_summary(run):
+    utilization = department_utilization(run.events)
+
+    matrix = utilization_matrix(utilization)
+    assert matrix.columns == ["month", "Finance", "Immobilisations", "Imports"]
+    assert matrix["month"].is_sorted()
+    assert matrix.row(0)[1:] == (1.0, 1.0, 1.0)
+
+    summary = department_summary(utilization)
+    assert summary["department"].to_list() == ["Finance", "Immobilisations", "Imports"]
+    assert (summary["peak_utilization"] <= 1).all()
+
+
+def test_waiting_and_finish_distributions(run):
+    spells = waiting_spells(run.events)
+    finished = finish_times(run.events)
+
+    assert (spells["months"] >= 0).all()
+    assert finished.height == len(run.employees)
+    assert finished["finish"].null_count() == sum(
+        emp.status.name != "FINISHED" for emp in run.employees
+    )
+
+    stats = distribution(finished["months"])
+    assert stats["count"].item() == len(run.employees)
+    assert stats["p10"].item() <= stats["p50"].item() <= stats["p90"].item()
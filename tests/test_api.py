@@ -0,0 +1,79 @@
+from employee_rotation import simulate
+from employee_rotation.config import Config
+from employee_rotation.data import split_roster
+from employee_rotation.models import Rules
+from employee_rotation.report import training_stints
+from employee_rotation.simulation import run_simulation
+from datetime import datetime as dt
+from pathlib import Path
+import builtins
+
+import polars as pl
+import pytest
+
+ORIGIN = dt(2025, 3, 1)
+DURATIONS = {"Finance": 12, "Imports": 6, "Immobilisations": 9}
+
+
+@pytest.fixture()
+def roster():
+    return pl.DataFrame(
+        [
+            (
+                f"EMP{i}",
+                "BEGHOURA",
+                "MF"[i % 2],
+                dt(2023, 1 + i, 1),
+                dept,
+                DURATIONS[dept],
+            )
+            for i, dept in enumerate(list(DURATIONS) * 3)
+        ],
+        schema=[
+            "first_name",
+            "last_name",
+            "gender",
+            "start_date",
+            "current_department",
+            "duration_months",
+        ],
+        orient="row",
+    )
+
+
+def test_simulate_touches_no_file(roster, tmp_path, monkeypatch):
+    class MemoryConfig(Config):
+        INPUT_FOLDER = tmp_path / "missing"
+        OUTPUT_FOLDER = tmp_path / "missing"
+        rotations = 36
+
+    def no_io(*args, **kwargs):
+        raise AssertionError("simulate must not touch the disk")
+
+    monkeypatch.setattr(builtins, "open", no_io)
+    monkeypatch.setattr(Path, "mkdir", no_io)
+
+    result = simulate(roster, MemoryConfig(), origin=ORIGIN)
+
+    assert not MemoryConfig.OUTPUT_FOLDER.exists()
+    assert result.run.checkpoints == {}
+    assert result.plan.columns == ["employee", "name", "department", "start", "end"]
+    assert (
+        result.events.filter(pl.col("tick") == 0)["kind"].to_list()
+        == ["ASSIGN"] * roster.height
+    )
+    assert (
+        result.events.filter(pl.col("kind") == "FINISH")["department"].is_null().all()
+    )
+    assert sorted(result.summary["department"]) == sorted(DURATIONS)
+
+
+def test_simulate_accepts_split_frames(roster, config):
+    departments, employees = split_roster(roster)
+    rules = Rules().add_rules(config.rules)
+
+    result = simulate((departments, employees), config, rules, origin=ORIGIN)
+    run = run_simulation(departments, employees, rules, config, origin=ORIGIN)
+
+    assert result.plan.equals(training_stints(run.events))
+    assert result.run.lines() == run.lines()
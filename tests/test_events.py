@@ -0,0 +1,119 @@
+from employee_rotation.models import EventKind, EventLog, Rules, Status
+from employee_rotation.report import employees_training_plan, replay_snapshots
+from employee_rotation.report_pipeline import REPORTS, write_reports
+from employee_rotation.simulation import run_simulation
+from dataclasses import replace
+
+import polars as pl
+import pytest
+
+
+def test_event_log_frame_round_trip(run):
+    frame = run.events.to_frame()
+    log = EventLog()
+    log.extend_frame(frame)
+
+    assert log.to_frame().equals(frame)
+    assert frame.filter(pl.col("tick") == 0)["kind"].to_list() == [
+        EventKind.ASSIGN
+    ] * len(run.employees)
+
+
+def test_replay_matches_final_state(run):
+    *_, last = replay_snapshots(run.events)
+
+    assert len(run.events.tick_dates) == 1 + 48
+    assert last.training == sum(dept.current_capacity for dept in run.departements)
+    assert last.finished == sum(len(dept.finished) for dept in run.departements)
+    assert last.finished == sum(emp.status is Status.FINISHED for emp in run.employees)
+
+
+def test_training_plan_matches_employee_history(run):
+    history = [
+        ",".join(
+            (
+                str(i + 1),
+                emp.full_name,
+                dept.name,
+                start.strftime("%Y-%m"),
+                end.strftime("%Y-%m"),
+            )
+        )
+        for i, emp in enumerate(run.employees)
+        for dept, start, end in emp.previous_departments
+    ]
+
+    assert employees_training_plan(run.events) == history
+
+
+def test_rolling_horizon_flushes_events_and_evicts_finished(run, config, tmp_path):
+    class RollingConfig(type(config)):
+        rolling_horizon_rotations = 6
+
+    rolling = run_simulation(
+        run.departments_df,
+        run.employees_df,
+        Rules().add_rules(config.rules),
+        RollingConfig(),
+        origin=run.origin,
+        checkpoints=False,
+        archive=tmp_path / "events",
+    )
+
+    assert rolling.lines() == run.lines()
+    assert rolling.events.to_frame().equals(run.events.to_frame())
+    assert len(rolling.events) == len(run.events)
+    assert len(rolling.events.kinds) < len(run.events)
+    assert len(rolling.employees) < len(run.employees)
+    with pytest.raises(ValueError):
+        rolling.events.truncate(0)
+
+
+def test_rolling_horizon_reports_scan_the_archive(run, config, tmp_path, monkeypatch):
+    class RollingConfig(type(config)):
+        rolling_horizon_rotations = 6
+
+    rolling = run_simulation(
+        run.departments_df,
+        run.employees_df,
+        Rules().add_rules(config.rules),
+        RollingConfig(),
+        origin=run.origin,
+        archive=tmp_path / "events",
+    )
+    (tmp_path / "full").mkdir()
+    (tmp_path / "rolling").mkdir()
+    expected = write_reports(run, tmp_path / "full")
+
+    def concat(log):
+        raise AssertionError("the archive should be scanned, not concatenated")
+
+    monkeypatch.setattr(EventLog, "to_frame", concat)
+    written = write_reports(rolling, tmp_path / "rolling")
+
+    assert rolling.events.segments
+    for name, file in written.items():
+        if name != "events":
+            assert file.read_text() == expected[name].read_text()
+
+    monkeypatch.undo()
+    saved = EventLog.read(written["events"])
+    assert saved.to_frame().equals(run.events.to_frame())
+
+
+def test_saved_event_log_writes_the_same_reports(run, tmp_path):
+    (tmp_path / "run").mkdir()
+    (tmp_path / "saved").mkdir()
+    written = write_reports(run, tmp_path / "run")
+
+    saved = EventLog.read(written["events"])
+    assert saved.to_frame().equals(run.events.to_frame())
+    assert saved.tick_dates == run.events.tick_dates
+    assert saved.employee_names == run.events.employee_names
+    assert saved.department_names == run.events.department_names
+    assert saved.capacities == run.events.capacities
+
+    reports = [name for name in REPORTS if name != "events"]
+    replayed = write_reports(replace(run, events=saved), tmp_path / "saved", reports)
+    for name, file in replayed.items():
+        assert file.read_text() == written[name].read_text()
@@ -0,0 +1,144 @@
+from employee_rotation.data import attach_history
+from employee_rotation.feasibility import check_feasibility, format_feasibility_output
+from employee_rotation.models import Rules
+from datetime import datetime as dt
+
+import polars as pl
+import pytest
+
+ORIGIN = dt(2025, 1, 1)
+
+
+@pytest.fixture()
+def frames(make_roster):
+    def frames(headcount=12, capacity=4):
+        return make_roster(
+            headcount=headcount,
+            capacity=capacity,
+            durations={"Finance": 12, "Immobilisations": 6, "Imports": 6},
+            start_date=dt(2024, 12, 1),
+        )
+
+    return frames
+
+
+def test_feasible_plan(frames, config):
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(), rules, config, origin=ORIGIN)
+
+    assert report.feasible
+    assert report.bottlenecks == []
+    assert report.earliest_finish_months >= 24
+    assert report.earliest_finish > ORIGIN
+
+
+def test_exclusion_coverage(frames, config):
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(), rules, config, origin=ORIGIN)
+    immobilisations = report.departments.filter(
+        pl.col("department") == "Immobilisations"
+    )
+
+    assert immobilisations["required_employees"].item() == 6
+    assert immobilisations["excluded_employees"].item() == 6
+    assert report.stuck_employees == 2
+
+
+def test_department_everybody_is_excluded_from_is_not_hopeless(frames, config):
+    rules = Rules().add_rules(config.rules)
+    departments, employees = frames(headcount=30, capacity=10)
+    employees = employees.with_columns(gender=pl.lit("F"))
+
+    report = check_feasibility(departments, employees, rules, config, origin=ORIGIN)
+    immobilisations = report.departments.filter(
+        pl.col("department") == "Immobilisations"
+    )
+
+    assert immobilisations["excluded_employees"].item() == 30
+    assert report.first_finish_months <= report.horizon_months
+    assert not report.hopeless
+
+
+def test_limit_makes_plan_infeasible_but_not_hopeless(frames, config):
+    config.rotations = 12
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(headcount=60, capacity=20), rules, config)
+
+    assert not report.feasible
+    assert not report.hopeless
+    assert report.first_finish_months <= report.horizon_months
+    assert set(report.bottlenecks) == {"Finance", "Imports", "Immobilisations"}
+    assert "Infeasible plan" in format_feasibility_output(report)[-1]
+
+
+def test_plan_nobody_can_finish_is_hopeless(frames, config):
+    config.rotations = 3
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(), rules, config, origin=ORIGIN)
+
+    assert report.hopeless_reasons == ["nobody can finish within the horizon"]
+    assert "Hopeless plan" in format_feasibility_output(report)[-1]
+
+
+def test_department_without_seats_is_never_finished(frames, config):
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(capacity=0), rules, config, origin=ORIGIN)
+
+    assert not report.feasible
+    assert report.earliest_finish is None
+    assert report.hopeless_reasons[0].startswith("no seats in")
+
+
+def test_history_of_a_warm_start_is_not_required_again(frames, config):
+    config.rotations = 18
+    rules = Rules().add_rules(config.rules)
+    departments, employees = frames()
+    history = pl.DataFrame(
+        [
+            (f"Beghoura Emp{i}", department, dt(2020, 1, 1), dt(2021, 1, 1))
+            for i, current in enumerate(employees["current_department"])
+            for department in departments["current_department"]
+            if department != current
+        ],
+        schema=["name", "department", "start", "end"],
+        orient="row",
+    )
+
+    cold = check_feasibility(departments, employees, rules, config, origin=ORIGIN)
+    warm = check_feasibility(
+        departments,
+        attach_history(employees, history, ORIGIN),
+        rules,
+        config,
+        origin=ORIGIN,
+    )
+
+    assert not cold.feasible
+    assert warm.feasible
+    assert sorted(warm.departments["required_employees"]) == [2, 4, 4]
+    assert warm.departments["trained_employees"].sum() == 24 - 4
+    assert not warm.hopeless
+
+
+def test_limit_of_zero_is_hopeless(frames, config):
+    class FrozenConfig(type(config)):
+        rules = [
+            "train_once_in_each_dept",
+            "exclude_female_from_Immobilisations",
+            ("cannot_move_more_than_limit", {"limit": 0}),
+        ]
+
+    config = FrozenConfig()
+    rules = Rules().add_rules(config.rules)
+
+    report = check_feasibility(*frames(), rules, config, origin=ORIGIN)
+
+    assert not report.feasible
+    assert report.hopeless
+    assert report.hopeless_reasons[0].startswith("nobody can leave")
+    assert "Hopeless plan" in format_feasibility_output(report)[-1]
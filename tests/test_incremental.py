@@ -0,0 +1,155 @@
+from employee_rotation.data import load_data
+from employee_rotation.incremental import replan
+from employee_rotation.models import Rules
+from employee_rotation.report import employees_training_plan
+from employee_rotation.simulation import run_simulation
+from datetime import datetime as dt
+
+import pytest
+
+ORIGIN = dt(2025, 3, 1)
+DURATIONS = {"Finance": 12, "Achats Local": 6, "Imports": 6, "Immobilisations": 9}
+
+
+@pytest.fixture()
+def frames(make_roster):
+    durations = dict(sorted(DURATIONS.items()))
+
+    def frames(rows):
+        return make_roster(capacity=None, durations=durations, rows=rows)
+
+    return frames
+
+
+@pytest.fixture()
+def rules(config):
+    return Rules().add_rules(config.rules)
+
+
+@pytest.fixture()
+def roster():
+    sections = list(DURATIONS)
+    return [
+        (
+            f"EMP{i}",
+            "BEGHOURA",
+            "MF"[i % 2],
+            dt(2023, 1 + i % 12, 1 + i % 27),
+            sections[i % len(sections)],
+        )
+        for i in range(16)
+    ]
+
+
+def test_unchanged_roster_reuses_the_previous_run(frames, roster, rules, config):
+    previous = replan(None, *frames(roster), rules, config)
+
+    assert previous.checkpoints
+    assert replan(previous, *frames(roster), rules, config) is previous
+
+
+def test_same_data_sheet_reuses_the_previous_run(roster, rules, config, tmp_path):
+    data = tmp_path / "data.csv"
+    header = "Nom,Prénom,Sexe,Date Recrutement,Section,Durée Par section"
+    data.write_text(
+        "\n".join(
+            [header]
+            + [
+                f"{first},{last},{gender},{start:%m/%d/%Y},{dept},{DURATIONS[dept]}"
+                for first, last, gender, start, dept in roster
+            ]
+        )
+    )
+
+    departments, _ = load_data(data)
+    assert departments["current_department"].to_list() == list(DURATIONS)
+
+    previous = replan(None, *load_data(data), rules, config)
+    for _ in range(5):
+        assert replan(previous, *load_data(data), rules, config) is previous
+
+
+def test_reordered_departments_are_replanned(frames, roster, rules, config):
+    previous = run_simulation(
+        *frames(roster), rules, config, origin=ORIGIN, checkpoints=True
+    )
+    departments, employees = frames(roster)
+    departments = departments.reverse()
+
+    replanned = replan(previous, departments, employees, rules, config, today=ORIGIN)
+    full = run_simulation(departments, employees, rules, config, origin=ORIGIN)
+
+    assert replanned.lines() == full.lines()
+    assert replanned.lines() != previous.lines()
+
+
+@pytest.mark.parametrize(
+    "update",
+    [
+        lambda rows: rows + [("NEW", "HIRE", "F", dt(2026, 6, 1), "Finance")],
+        lambda rows: rows[:5] + rows[6:],
+        lambda rows: rows[:-1] + [rows[-1][:4] + ("Imports",)],
+        lambda rows: rows[::-1],
+    ],
+)
+def test_replan_matches_full_run(frames, roster, rules, config, update):
+    previous = run_simulation(
+        *frames(roster), rules, config, origin=ORIGIN, checkpoints=True
+    )
+    departments, employees = frames(update(roster))
+
+    replanned = replan(previous, departments, employees, rules, config, today=ORIGIN)
+    full = run_simulation(departments, employees, rules, config, origin=ORIGIN)
+
+    assert replanned.lines() == full.lines()
+    assert employees_training_plan(replanned.events) == employees_training_plan(
+        full.events
+    )
+
+
+LATE_HIRE = ("NEW", "HIRE", "M", dt(2026, 6, 1), "Finance")
+
+
+def test_successive_updates_match_a_full_run(frames, roster, rules, config):
+    run = run_simulation(
+        *frames(roster), rules, config, origin=ORIGIN, checkpoints=True
+    )
+    run = replan(run, *frames(roster + [LATE_HIRE]), rules, config, today=ORIGIN)
+    updated = roster + [("LATER", "HIRE", "M", dt(2026, 9, 1), "Imports"), LATE_HIRE]
+    departments, employees = frames(updated)
+
+    replanned = replan(run, departments, employees, rules, config, today=ORIGIN)
+    full = run_simulation(departments, employees, rules, config, origin=ORIGIN)
+
+    assert min(replanned.checkpoints) == 0
+    assert replanned.lines() == full.lines()
+    assert employees_training_plan(replanned.events) == employees_training_plan(
+        full.events
+    )
+
+
+def test_unchanged_roster_keeps_its_start_date(frames, roster, rules, config):
+    previous = run_simulation(
+        *frames(roster), rules, config, origin=ORIGIN, checkpoints=True
+    )
+
+    kept = replan(previous, *frames(roster), rules, config, today=dt(2026, 3, 1))
+
+    assert kept is previous
+    assert kept.origin == ORIGIN
+
+
+def test_changed_roster_is_planned_from_today(frames, roster, rules, config):
+    previous = run_simulation(
+        *frames(roster), rules, config, origin=ORIGIN, checkpoints=True
+    )
+    today = dt(2026, 3, 1)
+    departments, employees = frames(roster + [LATE_HIRE])
+
+    replanned = replan(previous, departments, employees, rules, config, today=today)
+
+    assert replanned.origin == today
+    assert (
+        replanned.lines()
+        == run_simulation(departments, employees, rules, config, origin=today).lines()
+    )
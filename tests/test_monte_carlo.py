@@ -0,0 +1,130 @@
+from employee_rotation.models import EventKind, Rules
+from employee_rotation.monte_carlo import (
+    ReplicaOutcome,
+    Uncertainty,
+    run_monte_carlo,
+    simulate_replica,
+    summarize_replicas,
+)
+from employee_rotation.simulation import run_simulation
+from datetime import datetime as dt, timedelta
+from array import array
+import math
+
+import polars as pl
+import pytest
+
+ORIGIN = dt(2025, 1, 1)
+
+
+@pytest.fixture()
+def frames(make_roster):
+    return make_roster(
+        durations={"Finance": 6, "Immobilisations": 3, "Imports": 3}, year=2024
+    )
+
+
+def test_replica_without_uncertainty_matches_plan(frames, config):
+    rules = Rules().add_rules(config.rules)
+
+    outcome = simulate_replica(*frames, rules, config, ORIGIN, Uncertainty(), 0)
+    run = run_simulation(*frames, rules, config, origin=ORIGIN)
+
+    first_finish = dict(
+        run.events.to_frame()
+        .filter(pl.col("kind") == EventKind.FINISH)
+        .group_by("employee")
+        .agg(pl.col("date").min())
+        .iter_rows()
+    )
+    assert not any(outcome.quit)
+    for i, months in enumerate(outcome.finish_months):
+        if math.isnan(months):
+            assert i not in first_finish
+        else:
+            assert ORIGIN + timedelta(days=30 * months) == first_finish[i]
+
+
+def test_monte_carlo_is_seeded_and_counts_attrition(frames, config):
+    uncertainty = Uncertainty(
+        duration_spread=0.3, absence_probability=0.5, absence_months=2
+    )
+
+    first, second = (
+        run_monte_carlo(
+            *frames,
+            config,
+            uncertainty,
+            replicas=6,
+            workers=2,
+            seed=3,
+            origin=ORIGIN,
+        )
+        for _ in range(2)
+    )
+    assert first.employees.equals(second.employees)
+    assert first.departments.equals(second.departments)
+    assert first.employees.height == 9
+    assert first.departments["department"].n_unique() == 3
+    assert (first.employees["finish_p10"] <= first.employees["finish_p90"]).all()
+
+    everybody_quits = run_monte_carlo(
+        *frames,
+        config,
+        Uncertainty(attrition_per_year=1),
+        replicas=2,
+        workers=1,
+        origin=ORIGIN,
+    )
+    assert (everybody_quits.employees["quit_probability"] == 1).all()
+    assert (everybody_quits.employees["finish_probability"] == 0).all()
+
+
+def test_finish_percentiles_count_non_finishers_as_censored(frames):
+    departments, employees = frames
+    nan = float("nan")
+    outcomes = [
+        ReplicaOutcome(
+            finish_months=array("d", [20.0 if i == 0 else nan, i + 1] + [nan] * 7),
+            quit=[False] * 9,
+            pending=[0] * departments.height,
+        )
+        for i in range(10)
+    ]
+
+    result = summarize_replicas(departments, employees, outcomes, ORIGIN)
+    rare, always = result.employees.head(2).iter_rows(named=True)
+
+    assert rare["finish_probability"] == 0.1
+    assert rare["finish_p10"] == ORIGIN + timedelta(days=30 * 20)
+    assert rare["finish_p50"] is None and rare["finish_p90"] is None
+    assert always["finish_p50"] == ORIGIN + timedelta(days=30 * 5)
+    assert always["finish_p90"] == ORIGIN + timedelta(days=30 * 9)
+
+
+def test_partial_attrition_leaves_unreached_percentiles_empty(frames, config):
+    result = run_monte_carlo(
+        *frames,
+        config,
+        Uncertainty(attrition_per_year=0.5),
+        replicas=10,
+        workers=2,
+        origin=ORIGIN,
+    )
+
+    assert 0 < result.employees["quit_probability"].mean() < 1
+    for q in (10, 50, 90):
+        assert (
+            result.employees[f"finish_p{q}"].is_null()
+            == (result.employees["finish_probability"] < q / 100)
+        ).all()
+
+
+def test_workers_see_settings_changed_at_runtime(frames, config):
+    type(config).rotations = 2
+
+    result = run_monte_carlo(
+        *frames, config, Uncertainty(), replicas=2, workers=2, origin=ORIGIN
+    )
+
+    assert (result.employees["finish_probability"] == 0).all()
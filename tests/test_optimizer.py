@@ -0,0 +1,109 @@
+from employee_rotation.models import EventKind, Rules
+from employee_rotation.optimizer import optimize_rotation_order, score_plan
+from employee_rotation.simulation import run_simulation
+from datetime import datetime as dt
+import time
+
+import polars as pl
+import pytest
+
+
+@pytest.fixture()
+def frames(make_roster):
+    return make_roster(
+        headcount=12,
+        capacity=4,
+        durations={"Finance": 12, "Immobilisations": 6, "Imports": 6},
+        year=2024,
+    )
+
+
+def test_score_plan_counts_every_employee(frames, config):
+    rules = Rules().add_rules(config.rules)
+
+    score = score_plan(*frames, rules, config, origin=dt(2025, 1, 1))
+
+    assert score.total == score.completion + score.waiting
+    assert score.completion >= 12 * config.rotation_length_in_months
+
+
+def test_score_plan_counts_only_the_first_finish(make_roster, config):
+    # Without train_once_in_each_dept finished employees rotate again
+    frames = make_roster(
+        headcount=24,
+        capacity=8,
+        durations={"Finance": 12, "Immobilisations": 6, "Imports": 6},
+        year=2024,
+    )
+    rules = Rules()
+    origin = dt(2025, 1, 1)
+
+    score = score_plan(*frames, rules, config, origin=origin)
+
+    events = run_simulation(*frames, rules, config, origin=origin).events.to_frame()
+    finishes = events.filter(pl.col("kind") == EventKind.FINISH)
+    assert finishes["employee"].is_duplicated().any()
+    first = finishes.group_by("employee").agg(pl.col("tick").min())
+    expected = first["tick"].sum() + (24 - first.height) * config.rotations
+    assert score.completion == pytest.approx(
+        expected * config.rotation_length_in_months
+    )
+
+
+def test_optimizer_never_worse_and_respects_rules(frames, config):
+    departments, employees = frames
+
+    result = optimize_rotation_order(
+        departments, employees, config, budget_seconds=3, workers=2
+    )
+
+    assert result.score <= result.baseline
+    assert result.evaluations >= 1
+    assert sorted(result.employees_df["first_name"]) == sorted(employees["first_name"])
+
+    rules = Rules().add_rules(config.rules)
+    run = run_simulation(result.departments_df, result.employees_df, rules, config)
+    for emp in run.employees:
+        visited = [entry[0].name for entry in emp.previous_departments]
+        if emp.sexe == "F":
+            assert "Immobilisations" not in visited[1:]
+
+    (limit,) = [
+        kwargs["limit"] for kwargs in rules.parameters("cannot_move_more_than_limit")
+    ]
+    releases = (
+        run.events.to_frame()
+        .filter(pl.col("kind") == EventKind.REMOVE)
+        .group_by("tick", "department")
+        .len()
+    )
+    assert releases["len"].max() <= limit
+
+
+def test_optimizer_stops_at_the_deadline(frames, config):
+    departments, employees = frames
+
+    started = time.monotonic()
+    result = optimize_rotation_order(
+        departments, employees, config, budget_seconds=1.5, workers=2
+    )
+
+    # Spawning and killing the workers takes its time on a loaded machine
+    assert time.monotonic() - started < 1.5 + 3
+    assert result.score <= result.baseline
+
+
+def test_optimizer_without_a_score_returns_the_input_order(make_roster, config):
+    # One evaluation takes longer than the whole budget
+    config.rotations = 300
+    departments, employees = make_roster(headcount=100, capacity=None, year=2024)
+
+    started = time.monotonic()
+    result = optimize_rotation_order(
+        departments, employees, config, budget_seconds=0.5, workers=2
+    )
+
+    assert time.monotonic() - started < 0.5 + 3
+    assert result.score is None and result.baseline is None
+    assert result.employees_df.equals(employees)
+    assert result.departments_df.equals(departments)
@@ -0,0 +1,85 @@
+from employee_rotation import report_pipeline
+from employee_rotation.data import write_data
+from employee_rotation.models import EventLog, Rules
+from employee_rotation.report_pipeline import REPORTS, write_reports
+from employee_rotation.simulation import run_simulation
+from datetime import datetime as dt
+
+import polars as pl
+import pytest
+
+
+def test_write_reports_writes_every_report(run, tmp_path):
+    written = write_reports(run, tmp_path)
+
+    assert list(written) == list(REPORTS)
+    assert all(file.exists() for file in written.values())
+
+    serial = tmp_path / "serial.txt"
+    write_data(serial, run.lines())
+    assert written["plan"].read_text() == serial.read_text()
+
+    timelines = pl.read_csv(written["employee_timelines"])
+    assert set(timelines["activity"]) <= {"training", "waiting"}
+    assert timelines["employee"].n_unique() == len(run.employees)
+    rosters = pl.read_csv(written["department_rosters"])
+    assert rosters["department"].is_sorted()
+
+    summary = pl.read_csv(written["summary"])
+    assert summary["department"].to_list() == sorted(run.events.department_names)
+    assert "finished" not in summary.columns
+    roster = pl.read_csv(written["roster_summary"])
+    assert roster.height == 1
+    assert roster["employees"].item() == len(run.employees)
+    assert 0 < roster["finished"].item() <= roster["employees"].item()
+
+
+def test_write_reports_rejects_unknown_report(run, tmp_path):
+    with pytest.raises(ValueError):
+        write_reports(run, tmp_path, ["plan", "pdf"])
+
+
+def test_failing_report_does_not_stop_the_others(run, tmp_path, monkeypatch):
+    def broken(run, folder):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setitem(report_pipeline.REPORTS, "broken", broken)
+
+    with pytest.raises(ExceptionGroup) as error:
+        write_reports(run, tmp_path, ["broken", "plan", "summary"])
+
+    assert [str(e) for e in error.value.exceptions] == ["disk full"]
+    assert (tmp_path / "plan.txt").exists()
+    assert (tmp_path / "summary.csv").exists()
+
+
+def test_shared_tables_are_built_once(run, tmp_path, monkeypatch):
+    calls = []
+
+    def counted(name, build):
+        def wrapper(*args, **kwargs):
+            calls.append(name)
+            return build(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(EventLog, "to_frame", counted("events", EventLog.to_frame))
+    for name in ["department_utilization", "training_stints"]:
+        monkeypatch.setattr(
+            report_pipeline, name, counted(name, getattr(report_pipeline, name))
+        )
+
+    write_reports(run, tmp_path)
+
+    assert sorted(calls) == ["department_utilization", "events", "training_stints"]
+
+
+def test_reports_sharing_tables_can_run_together(config, make_roster, tmp_path):
+    rules = Rules().add_rules(config.rules)
+    run = run_simulation(
+        *make_roster(headcount=60, capacity=None), rules, config, origin=dt(2025, 3, 1)
+    )
+
+    for _ in range(20):
+        written = write_reports(run, tmp_path)
+        assert all(file.exists() for file in written.values())
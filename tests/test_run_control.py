@@ -0,0 +1,61 @@
+from employee_rotation.incremental import replan
+from employee_rotation.models import Rules
+from employee_rotation.report import employees_training_plan
+from employee_rotation.simulation import RunControl, run_simulation
+
+
+def test_tick_budget_keeps_the_partial_plan(run, config):
+    rules = Rules().add_rules(config.rules)
+    progress = []
+    control = RunControl(
+        max_ticks=20, on_progress=progress.append, progress_every_ticks=5
+    )
+
+    partial = run_simulation(
+        run.departments_df,
+        run.employees_df,
+        rules,
+        config,
+        origin=run.origin,
+        checkpoints=True,
+        control=control,
+    )
+
+    assert partial.stopped == "tick budget"
+    assert partial.events.tick == 20
+    assert partial.events.tick_dates == run.events.tick_dates[:21]
+    assert sorted(partial.checkpoints) == [0, 6, 12, 18]
+    assert [p.tick for p in progress] == [5, 10, 15, 20]
+    assert all(p.rotations == config.rotations for p in progress)
+    assert set(employees_training_plan(partial.events)) <= set(
+        employees_training_plan(run.events)
+    )
+
+    resumed = replan(partial, run.departments_df, run.employees_df, rules, config)
+    assert resumed.stopped is None
+    assert resumed.events.tick_dates == run.events.tick_dates
+    assert resumed.lines() == run.lines()
+    assert partial.events.tick == 20
+
+
+def test_cancel_stops_after_the_current_rotation(run, config):
+    control = RunControl(progress_every_ticks=1)
+
+    def cancel_at_tick_3(progress):
+        assert progress.active_trainees <= 9
+        if progress.tick == 3:
+            control.cancel()
+
+    control.on_progress = cancel_at_tick_3
+    cancelled = run_simulation(
+        run.departments_df,
+        run.employees_df,
+        Rules().add_rules(config.rules),
+        config,
+        origin=run.origin,
+        control=control,
+    )
+
+    assert cancelled.stopped == "cancelled"
+    assert cancelled.events.tick == 4
+    assert RunControl(budget_seconds=0).stop_reason(0, 0.0) == "time budget"
@@ -0,0 +1,115 @@
+from employee_rotation.data import attach_history, load_history
+from employee_rotation.models import Rules
+from employee_rotation.report import employees_training_plan, training_stints
+from employee_rotation.report_pipeline import write_reports
+from employee_rotation.simulation import run_simulation
+
+from datetime import datetime as dt
+
+import polars as pl
+import pytest
+
+
+def test_load_history_reads_plan_per_employee(run, tmp_path):
+    written = write_reports(run, tmp_path, ["plan_per_emp"])
+
+    history = load_history(written["plan_per_emp"])
+    finished = training_stints(run.events).filter(pl.col("end").is_not_null())
+
+    assert history.columns == ["employee", "name", "department", "start", "end"]
+    assert history["employee"].to_list() == (finished["employee"] + 1).to_list()
+    assert history["name"].to_list() == finished["name"].to_list()
+    assert history["department"].to_list() == finished["department"].to_list()
+    assert history["start"].equals(finished["start"].dt.truncate("1mo"))
+
+
+def test_empty_plan_has_no_history(run, tmp_path):
+    (tmp_path / "plan_per_emp.txt").touch()
+
+    history = load_history(tmp_path / "plan_per_emp.txt")
+    warm = attach_history(run.employees_df, history)
+
+    assert history.is_empty()
+    assert warm["history"].null_count() == warm.height
+
+
+def test_homonyms_keep_their_own_history(make_roster):
+    rows = [
+        ("ALI", "BEN", "M", dt(2020, 1, 1), "Finance"),
+        ("EMP1", "BEGHOURA", "F", dt(2020, 1, 1), "Imports"),
+        ("ALI", "BEN", "M", dt(2020, 1, 1), "Imports"),
+    ]
+    _, employees = make_roster(capacity=None, rows=rows)
+    history = pl.DataFrame(
+        [
+            (1, "Ben Ali", "Imports", dt(2021, 1, 1), dt(2021, 7, 1)),
+            (3, "Ben Ali", "Immobilisations", dt(2021, 1, 1), dt(2021, 10, 1)),
+        ],
+        schema=["employee", "name", "department", "start", "end"],
+        orient="row",
+    )
+
+    warm = attach_history(employees, history, dt(2025, 1, 1))
+
+    assert [
+        [stint["department"] for stint in stints or []]
+        for stints in warm["history"].to_list()
+    ] == [["Imports"], [], ["Immobilisations"]]
+    with pytest.raises(ValueError, match="Ben Ali"):
+        attach_history(employees, history.drop("employee"))
+    with pytest.raises(ValueError, match="Ben Ali"):
+        attach_history(employees[:2], history)
+
+
+def test_warm_start_resumes_from_today(run, config):
+    today = run.events.tick_dates[24]
+    stints = training_stints(run.events)
+    finished = stints.filter(pl.col("end") <= today)
+    current = stints.filter(
+        (pl.col("start") <= today) & (pl.col("end").is_null() | (pl.col("end") > today))
+    )
+    roster = (
+        run.employees_df.with_row_index("employee")
+        .with_columns(pl.col("employee").cast(pl.Int32))
+        .join(current, on="employee")
+        .select(
+            "first_name",
+            "last_name",
+            "gender",
+            start_date="start",
+            current_department="department",
+        )
+    )
+
+    warm = attach_history(roster, stints.drop("employee"), today)
+    resumed = run_simulation(
+        run.departments_df,
+        warm,
+        Rules().add_rules(config.rules),
+        config,
+        origin=today,
+    )
+
+    assert warm.columns == [*roster.columns, "history"]
+    assert warm["history"].null_count() < warm.height
+    for emp, history in zip(resumed.employees, warm["history"].to_list()):
+        past = [stint["department"] for stint in history or []]
+        trained = [dept.name for dept, _, _ in emp.previous_departments]
+        assert trained[: len(past)] == past
+        assert len(trained) == len(set(trained))
+
+    current_department = {
+        emp.full_name: department
+        for emp, department in zip(resumed.employees, roster["current_department"])
+    }
+    plan = {
+        line.split(",", 1)[1]
+        for line in employees_training_plan(resumed.events, resumed.employees_df)
+    }
+    assert {
+        f"{name},{department},{start:%Y-%m},{end:%Y-%m}"
+        for name, department, start, end in finished.select(
+            "name", "department", "start", "end"
+        ).iter_rows()
+        if current_department.get(name, department) != department
+    } <= plan